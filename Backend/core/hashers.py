@@ -0,0 +1,16 @@
+# ============================================================================
+# HASHERS: How passwords are turned into the stored "password_hash" strings
+# We use Argon2id (memory-hard: expensive to crack on GPUs) with settings
+# tuned so a single login/password change stays quick on our small server.
+# Older pbkdf2_sha256$... hashes still work (see PASSWORD_HASHERS in settings).
+# ============================================================================
+
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    # Same "argon2" algorithm name as Django's hasher, so hashes stay compatible;
+    # the parameters are stored inside every hash, so they can be changed later.
+    time_cost = 2
+    memory_cost = 65536  # KiB (64 MB)
+    parallelism = 4
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.services import assign_nearest_office_for_unassigned
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign the nearest police office to every report that has no office yet.\n"
+        "Meant to run periodically (cron / Task Scheduler) instead of on every request.\n"
+        "Safe: reports that already have an office are not changed."
+    )
+
+    def handle(self, *args, **options):
+        assigned = assign_nearest_office_for_unassigned()
+        self.stdout.write(self.style.SUCCESS(f"Done. Assigned={assigned}"))
@@ -48,7 +48,7 @@ class Command(BaseCommand):
 
             # Plain text detected; re-hash using Django's make_password
             fixed += 1
-            self.stdout.write(f"- FIX  {office.email}: plaintext -> pbkdf2_sha256")
+            self.stdout.write(f"- FIX  {office.email}: plaintext -> hashed")
             if not dry_run:
                 office.password_hash = make_password(raw)
                 office.save(update_fields=["password_hash"])
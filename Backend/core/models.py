@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 import uuid
 
 # ============================================================================
@@ -70,6 +72,12 @@ class User(models.Model):
     class Meta:
         db_table = 'tbl_users'
         verbose_name = 'Citizen User'
+        # Trigram indexes for Admin user search (icontains = UPPER(col) LIKE UPPER('%q%')).
+        # Built on UPPER(col) so they match exactly what Django sends (see Documentation/6 SUPABASE.MD)
+        indexes = [
+            GinIndex(OpClass(Upper(name), name='gin_trgm_ops'), name=f'user_{name}_trgm_idx')
+            for name in ('email', 'phone', 'first_name', 'last_name')
+        ]
 
 # POLICE OFFICE MODEL - Stores police station/precinct information
 # Who: Each police office (station) that responds to incident reports
@@ -175,6 +183,31 @@ class Report(models.Model):
     class Meta:
         db_table = 'tbl_reports'
         verbose_name = 'Incident Report'
+        # indexes = speed up the most common lookups (see Documentation/6 SUPABASE.MD)
+        # Tables are Supabase-managed, so the SQL in that doc is what actually creates them.
+        indexes = [
+            # Partial index: only Resolved rows (Resolved Cases page + top locations)
+            models.Index(
+                fields=['-updated_at', 'assigned_office'],
+                condition=models.Q(status='Resolved'),
+                name='report_resolved_updated_idx',
+            ),
+            # Police "our office" resolved list: status + office, newest first
+            models.Index(
+                fields=['status', 'assigned_office', '-updated_at'],
+                name='report_resolved_office_idx',
+            ),
+            # Date-range filters on a status (e.g. top locations, last 30 days)
+            models.Index(
+                fields=['status', 'created_at'],
+                name='rpt_status_created_idx',
+            ),
+            # Top locations: GROUP BY city, barangay, category for one status
+            models.Index(
+                fields=['status', 'location_city', 'location_barangay', 'category'],
+                name='rpt_status_location_cat_idx',
+            ),
+        ]
 
 # Message Model (Table G) 
 
@@ -268,6 +301,10 @@ class Checkpoint(models.Model):
     class Meta:
         db_table = 'tbl_checkpoints'
         verbose_name = 'Police Checkpoint'
+        # Active-now lookup (/checkpoints/active/) compares both shift times
+        indexes = [
+            models.Index(fields=['time_start', 'time_end'], name='checkpoint_shift_idx'),
+        ]
 
 # MEDIA MODEL - Stores photos/videos that citizens and police upload for a report
 # Who: Citizens and police can upload images or videos as evidence
@@ -339,4 +376,31 @@ class SummaryAnalytics(models.Model):
         verbose_name = 'Summary Analytics'
         # unique_together = prevent duplicate rows
         # Can't have two rows with same city + barangay + category
-        unique_together = ('location_city', 'location_barangay', 'category')
\ No newline at end of file
+        unique_together = ('location_city', 'location_barangay', 'category')
+
+# GEOCODE CACHE MODEL - Remembers Google reverse-geocode answers
+# Who: Filled automatically by services.reverse_geocode / reverse_geocode_address
+# Data: Rounded GPS "bucket" (4 decimals ~= 11 meters) -> city, barangay, address line
+# Why: The in-memory cache is per server process and is lost on restart;
+#      this table lets every process reuse answers instead of calling Google again
+class GeocodeCache(models.Model):
+    # Unique ID for this cached answer
+    geocode_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # Rounded coordinates (the lookup key)
+    lat_bucket = models.DecimalField(max_digits=9, decimal_places=4)
+    lng_bucket = models.DecimalField(max_digits=9, decimal_places=4)
+
+    # What Google returned for that spot
+    location_city = models.CharField(max_length=50, blank=True, null=True)
+    location_barangay = models.CharField(max_length=50, blank=True, null=True)
+    address_line = models.CharField(max_length=255, blank=True, null=True)
+
+    # When was this answer fetched from Google?
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'tbl_geocode_cache'
+        verbose_name = 'Geocode Cache'
+        # One row per rounded coordinate
+        unique_together = ('lat_bucket', 'lng_bucket')
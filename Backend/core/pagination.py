@@ -0,0 +1,21 @@
+# ============================================================================
+# PAGINATION: Split long lists into pages (?page=1, ?page=2, ...)
+# Our frontends were built against plain JSON arrays, so pagination is
+# OPT-IN: it only kicks in when the client sends ?page=N.
+# Without ?page the endpoint behaves exactly like before (full list).
+# ============================================================================
+
+from rest_framework.pagination import PageNumberPagination
+
+
+class OptionalPageNumberPagination(PageNumberPagination):
+    # Default rows per page (client can ask for more/less with ?page_size=)
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # No ?page= → return None so the view sends the full (unpaginated) list
+        if self.page_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
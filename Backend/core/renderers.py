@@ -0,0 +1,30 @@
+# ============================================================================
+# RENDERERS: Turn the Python data a view returns into the bytes we send back
+# DRF's default JSONRenderer uses Python's pure-Python json module.
+# orjson does the same job in native code, which matters for big list
+# endpoints (reports, media, map data, top locations, checkpoints).
+# ============================================================================
+
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# DRF's encoder knows how to handle Decimal, lazy strings, timedelta, etc.
+# orjson only calls it for types it can't serialize natively.
+_drf_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(BaseRenderer):
+    # Drop-in replacement for rest_framework.renderers.JSONRenderer
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    # OPT_PASSTHROUGH_DATETIME = let DRF format raw datetimes (e.g. from .values())
+    # so timestamps look exactly like before ('Z' suffix, millisecond precision).
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=_drf_encoder.default, option=self.options)
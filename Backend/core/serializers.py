@@ -10,6 +10,7 @@ from rest_framework import serializers
 from django.contrib.auth.hashers import make_password
 from django.core.files.storage import default_storage
 from django.conf import settings
+from django.db.models import Q
 from rest_framework.exceptions import ValidationError
 from supabase import create_client
 import logging
@@ -108,31 +109,46 @@ class AdminUpdateSerializer(serializers.ModelSerializer):
         model = Admin
         fields = ('username', 'email', 'contact', 'contact_no')
         extra_kwargs = {
-            'username': {'required': False},
-            'email': {'required': False},
+            # validators=[] turns off DRF's automatic per-field UniqueValidator;
+            # validate() below checks both fields in ONE query instead
+            'username': {'required': False, 'validators': []},
+            'email': {'required': False, 'validators': []},
             'contact_no': {'required': False, 'allow_blank': True, 'allow_null': True},
         }
-    
-    def validate_email(self, value):
-        """Ensure email is unique (excluding current admin)"""
-        if value:
-            # Get current admin from context (set in view)
-            current_admin = self.context.get('current_admin')
-            if current_admin:
-                # Check if another admin already has this email
-                if Admin.objects.filter(email=value).exclude(admin_id=current_admin.admin_id).exists():
-                    raise serializers.ValidationError("An admin with this email already exists.")
-        return value
-    
-    def validate_username(self, value):
-        """Ensure username is unique (excluding current admin)"""
-        if value:
-            current_admin = self.context.get('current_admin')
-            if current_admin:
-                if Admin.objects.filter(username=value).exclude(admin_id=current_admin.admin_id).exists():
-                    raise serializers.ValidationError("An admin with this username already exists.")
-        return value
-    
+
+    # Message shown for each field that is already taken by another admin
+    UNIQUE_FIELD_ERRORS = {
+        'email': "An admin with this email already exists.",
+        'username': "An admin with this username already exists.",
+    }
+
+    def validate(self, attrs):
+        """Ensure email/username are unique (excluding current admin), one query total"""
+        # Only check fields that are actually being changed (PATCH may send just contact_no)
+        wanted = {name: attrs[name] for name in self.UNIQUE_FIELD_ERRORS if attrs.get(name)}
+        current_admin = self.context.get('current_admin')
+        if not wanted or not current_admin:
+            return attrs
+
+        lookup = Q()
+        for name, value in wanted.items():
+            lookup |= Q(**{name: value})
+        # At most 2 rows can collide (one per unique field)
+        clashes = (
+            Admin.objects.filter(lookup)
+            .exclude(admin_id=current_admin.admin_id)
+            .values_list(*wanted.keys())[:2]
+        )
+
+        errors = {}
+        for row in clashes:
+            for name, existing in zip(wanted.keys(), row):
+                if existing == wanted[name]:
+                    errors[name] = [self.UNIQUE_FIELD_ERRORS[name]]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
     def update(self, instance, validated_data):
         # Handle contact field mapping
         if 'contact_no' in validated_data:
@@ -187,6 +203,13 @@ class PoliceOfficeLoginSerializer(serializers.ModelSerializer):
             'created_by_username',
         )
 
+    # Eager loading for read-only lists (admin map): one JOINed query that
+    # only pulls the columns above (never the password_hash)
+    @staticmethod
+    def setup_eager_loading(queryset):
+        fields = [f for f in PoliceOfficeLoginSerializer.Meta.fields if f != 'created_by_username']
+        return queryset.select_related('created_by').only(*fields, 'created_by__username')
+
 # POLICE OFFICE CREATION SERIALIZER
 # Used when: Admin creates a new police office (includes password handling)
 # Input: office_name, email, password (plain text), location, contact info
@@ -279,8 +302,8 @@ class ReportCreateSerializer(serializers.ModelSerializer):
             'latitude',          # GPS latitude of incident location
             'longitude',         # GPS longitude of incident location
             'reporter',          # Which citizen is reporting (their user ID)
-            'location_city',     # Will be auto-filled by reverse geocoding
-            'location_barangay'  # Will be auto-filled by reverse geocoding
+            'location_city',     # Auto-filled by reverse geocoding unless client sends both
+            'location_barangay'  # Auto-filled by reverse geocoding unless client sends both
         )
         # These fields are optional (can be calculated/filled later)
         extra_kwargs = {
@@ -385,6 +408,22 @@ class ReportListSerializer(serializers.ModelSerializer):
             'reporter',             # Nested reporter contact info
         )
     
+    # Columns this serializer reads from the report, reporter and office rows.
+    # Loading only these keeps the JOINed SELECT small (e.g. never pulls the
+    # office password_hash) while still fetching everything in ONE query.
+    ONLY_FIELDS = (
+        'report_id', 'category', 'status', 'created_at', 'latitude', 'longitude',
+        'description', 'location_city', 'location_barangay',
+        'assigned_office', 'assigned_office__office_name',
+        'reporter',
+    ) + tuple(f'reporter__{name}' for name in ReporterSerializer.Meta.fields)
+
+    # Eager loading for any queryset passed to this serializer (prevents N+1 queries)
+    # Usage: ReportListSerializer(ReportListSerializer.setup_eager_loading(qs), many=True)
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('reporter', 'assigned_office').only(*ReportListSerializer.ONLY_FIELDS)
+
     # Custom method: combine first and last name into full name
     # Called for each report when serializing to JSON
     def get_reporter_full_name(self, obj):
@@ -466,6 +505,13 @@ class CheckpointSerializer(serializers.ModelSerializer):
         read_only_fields = ('checkpoint_id', 'created_at', 'office_name')
         # Note: The office_id (foreign key) is provided in the request body
 
+    # Eager loading for read-only lists (admin map): all checkpoint columns +
+    # just the office name, in one JOINed query
+    @staticmethod
+    def setup_eager_loading(queryset):
+        fields = [f.name for f in Checkpoint._meta.concrete_fields]
+        return queryset.select_related('office').only(*fields, 'office__office_name')
+
     def to_representation(self, instance):
         data = super().to_representation(instance)
         raw = instance.assigned_officers or ''
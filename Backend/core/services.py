@@ -5,24 +5,35 @@
 # Examples: PDF rendering, geocoding, filtering, time calculations
 # ============================================================================
 
-import requests, os, qrcode, base64
+import requests, os, qrcode, base64, logging, threading, uuid
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, connections, transaction
 from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q, Value
 from django.db.models.functions import Coalesce
 from django.template.loader import render_to_string
 from django.utils import timezone
-from weasyprint import HTML
+from weasyprint import HTML, default_url_fetcher
+from weasyprint.text.fonts import FontConfiguration
 
-from .models import Report, PoliceOffice
+from .models import GeocodeCache, Report, PoliceOffice, SummaryAnalytics
+
+logger = logging.getLogger(__name__)
 
 # Load the API Key from settings (stored in environment variables for security)
 GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY')
 
+@lru_cache(maxsize=256)
 def generate_qr_code_base64(text: str) -> str:
-    """Generate a QR code (data URL) for any text/URL for printing in PDFs."""
+    """Generate a QR code (data URL) for any text/URL for printing in PDFs.
+
+    Memoized: re-exporting a case file re-encodes the same media URLs.
+    """
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -191,24 +202,147 @@ def _call_geocode_api(latitude, longitude):
         return None
 
 
-def reverse_geocode(latitude, longitude):
-    """Return (city, barangay) from coordinates, biased to barangay not district."""
+# Geocode results are cached so repeat lookups in the same spot skip the
+# Google API round-trip (and quota). Coordinates are rounded before building
+# the key: 4 decimals ~= 11 meters, small enough to keep barangay borders right.
+# Two levels:
+#   1) Django cache (in-memory, per process, fastest)
+#   2) tbl_geocode_cache (shared by every process, survives restarts)
+GEOCODE_CACHE_TTL = 60 * 60 * 24 * 30  # 30 days (addresses rarely change)
+GEOCODE_CACHE_PRECISION = 4
+
+
+def _geocode_bucket(latitude, longitude):
+    # Views pass floats, Decimals (model fields) or strings (request.data)
+    if latitude is None or longitude is None:
+        return None
+    try:
+        lat = round(float(latitude), GEOCODE_CACHE_PRECISION)
+        lng = round(float(longitude), GEOCODE_CACHE_PRECISION)
+    except (TypeError, ValueError):
+        return None
+    return lat, lng
+
+
+def _geocode_db_get(bucket):
+    try:
+        # Savepoint: a DB error here must not break the caller's transaction
+        with transaction.atomic():
+            row = (
+                GeocodeCache.objects.filter(lat_bucket=bucket[0], lng_bucket=bucket[1])
+                .values_list('location_city', 'location_barangay', 'address_line')
+                .first()
+            )
+    except DatabaseError as e:
+        logger.warning("Geocode table read failed: %s", e)
+        return None
+    return tuple(row) if row else None
+
+
+def _geocode_db_set(bucket, result):
+    city, barangay, address_line = result
+    try:
+        with transaction.atomic():
+            GeocodeCache.objects.update_or_create(
+                lat_bucket=bucket[0],
+                lng_bucket=bucket[1],
+                defaults={
+                    'location_city': city,
+                    'location_barangay': barangay,
+                    'address_line': address_line,
+                },
+            )
+    except DatabaseError as e:
+        logger.warning("Geocode table write failed: %s", e)
+
+
+def _geocode_components(latitude, longitude):
+    """Return (city, barangay, address_line), cached per rounded coordinate."""
+    bucket = _geocode_bucket(latitude, longitude)
+    key = f"revgeo:{bucket[0]}:{bucket[1]}" if bucket else None
+    if key:
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            logger.warning("Geocode cache read failed: %s", e)
+            cached = None
+        if cached is not None:
+            return cached
+
+        # Another process may already have asked Google about this spot
+        stored = _geocode_db_get(bucket)
+        if stored is not None:
+            try:
+                cache.set(key, stored, GEOCODE_CACHE_TTL)
+            except Exception as e:
+                logger.warning("Geocode cache write failed: %s", e)
+            return stored
+
     data = _call_geocode_api(latitude, longitude)
     if not data or not data.get('results'):
-        return None, None
-    city, barangay, _ = _parse_address_components(data['results'])
+        # Don't cache failures (quota/network); try again next time
+        return None, None, None
+    result = _parse_address_components(data['results'])
+
+    if key:
+        try:
+            cache.set(key, result, GEOCODE_CACHE_TTL)
+        except Exception as e:
+            logger.warning("Geocode cache write failed: %s", e)
+        _geocode_db_set(bucket, result)
+    return result
+
+
+def reverse_geocode(latitude, longitude):
+    """Return (city, barangay) from coordinates, biased to barangay not district."""
+    city, barangay, _ = _geocode_components(latitude, longitude)
     return city, barangay
 
 
 def reverse_geocode_address(latitude, longitude):
     """Return (address_line, barangay, city) for checkpoints and UI display."""
-    data = _call_geocode_api(latitude, longitude)
-    if not data or not data.get('results'):
-        return None, None, None
-    city, barangay, address_line = _parse_address_components(data['results'])
+    city, barangay, address_line = _geocode_components(latitude, longitude)
     return address_line, barangay, city
 
 
+def geocode_office(office_id):
+    # FUNCTION: Fill PoliceOffice.location_city/location_barangay from its GPS
+    # Used by: PoliceOfficeAdminViewSet (runs in the background after save)
+    office = PoliceOffice.objects.filter(office_id=office_id).values('latitude', 'longitude').first()
+    if not office:
+        return
+    city, barangay = reverse_geocode(office['latitude'], office['longitude'])
+    PoliceOffice.objects.filter(office_id=office_id).update(location_city=city, location_barangay=barangay)
+
+
+# ============================================================================
+# BACKGROUND TASKS: Run slow work after the response is sent
+# ============================================================================
+#
+# We don't run Celery, so slow side-jobs (like calling Google APIs) go to a
+# small in-process thread pool. Jobs start only AFTER the current database
+# transaction commits, so they always see the saved row.
+
+_background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='crash-bg')
+
+
+def _run_background_task(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(func, '__name__', func))
+    finally:
+        # Each thread has its own DB connection; close it when the job is done
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """Schedule func(*args, **kwargs) on the background pool after commit."""
+    transaction.on_commit(
+        lambda: _background_executor.submit(_run_background_task, func, args, kwargs)
+    )
+
+
 # ============================================================================
 # LOCATION UTILS: Distance and nearest office assignment
 # ============================================================================
@@ -248,57 +382,157 @@ def find_nearest_office(latitude, longitude, offices=None):
     return nearest
 
 
+# Fallback office for reports when no nearest office can be computed
+# (bad coordinates, offices missing GPS...). Cached so report creation only
+# re-checks one primary key instead of picking "the first office" every time.
+DEFAULT_OFFICE_CACHE_KEY = 'default_office_id'
+DEFAULT_OFFICE_CACHE_TTL = 300  # 5 minutes
+
+
+def get_default_office_id():
+    # The cache is per process, so forget_default_office() in another worker
+    # won't reach us: confirm a cached id still exists (PK lookup) before using it.
+    office_id = cache.get(DEFAULT_OFFICE_CACHE_KEY)
+    if office_id is not None and PoliceOffice.objects.filter(office_id=office_id).exists():
+        return office_id
+
+    office_id = PoliceOffice.objects.values_list('office_id', flat=True).first()
+    if office_id is None:
+        cache.delete(DEFAULT_OFFICE_CACHE_KEY)
+    else:
+        cache.set(DEFAULT_OFFICE_CACHE_KEY, office_id, DEFAULT_OFFICE_CACHE_TTL)
+    return office_id
+
+
+def forget_default_office():
+    # Call when an office is deleted (drops this worker's copy right away)
+    cache.delete(DEFAULT_OFFICE_CACHE_KEY)
+
+
+# PDF footers show the office name + head officer; offices rarely change,
+# so remember them for a few minutes instead of querying on every export.
+OFFICE_FOOTER_CACHE_TTL = 300  # 5 minutes
+
+
+def get_office_footer(office_id):
+    # FUNCTION: (office_name, head_officer_name) for a PDF footer, or None if not found
+    office_uuid = convert_user_id_to_uuid(office_id)
+    if office_uuid is None:
+        return None
+    cache_key = f'office_footer:{office_uuid}'
+    footer = cache.get(cache_key)
+    if footer is None:
+        row = PoliceOffice.objects.filter(office_id=office_uuid).values_list('office_name', 'head_officer').first()
+        # Cache misses too (as False) so a bad office_id doesn't hit the DB every time
+        footer = (row[0], row[1] or 'N/A') if row else False
+        cache.set(cache_key, footer, OFFICE_FOOTER_CACHE_TTL)
+    return footer or None
+
+
+def forget_office_footer(office_id):
+    # Call when an office is edited or deleted so PDFs don't show stale names
+    cache.delete(f'office_footer:{office_id}')
+
+
 def assign_nearest_office_for_unassigned():
-    offices = list(PoliceOffice.objects.all())
+    # FUNCTION: Give every unassigned report its nearest police office
+    # Output: Number of reports that got an office
+    # Only loads the columns we need, and writes all changes in batched UPDATEs
+    # (instead of one save() per report).
+    offices = list(PoliceOffice.objects.only('office_id', 'latitude', 'longitude'))
     if not offices:
-        return
-    unassigned = Report.objects.filter(assigned_office__isnull=True)
+        return 0
+    unassigned = Report.objects.filter(assigned_office__isnull=True).only('report_id', 'latitude', 'longitude')
+    to_update = []
     for r in unassigned:
         office = find_nearest_office(r.latitude, r.longitude, offices)
         if office:
             r.assigned_office = office
-            r.save(update_fields=['assigned_office'])
+            to_update.append(r)
+    if to_update:
+        Report.objects.bulk_update(to_update, ['assigned_office'], batch_size=500)
+    return len(to_update)
+
+
+def increment_summary_analytics(city, barangay, category, amount=1):
+    # FUNCTION: Add to the resolved-report count for one location + category
+    # Used by: Report status updates and admin manual inserts (count a new Resolved report)
+    # One INSERT ... ON CONFLICT DO UPDATE: creates the row the first time,
+    # otherwise adds to it - atomic in the DB, no row lock or retry needed.
+    if not city or not barangay or not category:
+        return
+    table = SummaryAnalytics._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (summary_id, location_city, location_barangay, category, report_count, last_updated)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (location_city, location_barangay, category)
+            DO UPDATE SET report_count = {table}.report_count + EXCLUDED.report_count,
+                          last_updated = EXCLUDED.last_updated
+            """,
+            [uuid.uuid4(), city, barangay, category, amount, timezone.now()],
+        )
+
+
+def rebuild_summary_analytics():
+    # FUNCTION: Recalculate the whole tbl_summary_analytics table
+    # Used by: AnalyticsUpdateAPIView (caller holds the advisory lock + transaction)
+    # The GROUP BY and the upsert both run inside PostgreSQL, so no report rows
+    # travel to Python. Existing rows are updated in place (the table is never
+    # empty mid-rebuild); rows that got no resolved reports are removed after.
+    # status is the report_status_enum, so plain equality is exact (and indexable).
+    now = timezone.now()
+    summary_table = SummaryAnalytics._meta.db_table
+    report_table = Report._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {summary_table} (summary_id, location_city, location_barangay, category, report_count, last_updated)
+            SELECT gen_random_uuid(), location_city, COALESCE(location_barangay, 'Unknown'), category, COUNT(*), %s
+            FROM {report_table}
+            WHERE status = 'Resolved'
+              AND location_city IS NOT NULL
+              AND location_city <> ''
+            GROUP BY location_city, COALESCE(location_barangay, 'Unknown'), category
+            ON CONFLICT (location_city, location_barangay, category)
+            DO UPDATE SET report_count = EXCLUDED.report_count,
+                          last_updated = EXCLUDED.last_updated
+            """,
+            [now],
+        )
+    # Rows not touched above have no resolved reports anymore
+    # (prevents old cities lingering)
+    SummaryAnalytics.objects.filter(last_updated__lt=now).delete()
 
 
-def get_active_checkpoints_list(all_checkpoints_qs):
+def filter_active_checkpoints(checkpoints_qs):
     # FUNCTION: Filter checkpoints to show only those currently active
-    # Input: QuerySet of all checkpoints from database
-    # Output: Python list of checkpoint objects that are active RIGHT NOW
+    # Input: QuerySet of checkpoints from database
+    # Output: QuerySet of checkpoints that are active RIGHT NOW
     # Used by: Views that show current/active checkpoints on map
-    # Logic: Compares current time to checkpoint's time_start and time_end
-    
-    # Get the current time (hour:minute:second)
-    current_time = datetime.now().time()
-    active_list = []
-
-    # Check each checkpoint to see if it's currently active
-    for checkpoint in all_checkpoints_qs:
-        start = checkpoint.time_start
-        end = checkpoint.time_end
+    # Logic: Compares current time to checkpoint's time_start and time_end.
+    # The check runs in SQL, so inactive checkpoints are never loaded.
+    # Checkpoints without time_start/time_end never match (NULL comparisons are false).
 
-        # Skip checkpoints without proper time settings
-        if start is None or end is None:
-            continue
+    # Get the current local time (hour:minute:second)
+    current_time = timezone.localtime().time()
 
-        # CASE 1: Normal shift (e.g., 6:00 AM to 2:00 PM)
-        # start < end means the shift is within the same day
-        if start < end:
-            # Active if current time is between start and end
-            # Example: start=06:00, current=09:00, end=14:00 → ACTIVE
-            if start <= current_time < end:
-                active_list.append(checkpoint)
+    # CASE 1: Normal shift (e.g., 6:00 AM to 2:00 PM)
+    # start < end means the shift is within the same day
+    # Active if current time is between start and end
+    # Example: start=06:00, current=09:00, end=14:00 → ACTIVE
+    same_day = Q(time_start__lt=F('time_end'), time_start__lte=current_time, time_end__gt=current_time)
 
-        # CASE 2: Overnight shift (e.g., 8:00 PM to 4:00 AM next day)
-        # start > end means the shift crosses midnight
-        else:
-            # Active if: NOW is after start (before midnight) OR NOW is before end (after midnight)
-            # Example: start=20:00, current=22:00, end=04:00 → ACTIVE (after 20:00)
-            # Example: start=20:00, current=02:00, end=04:00 → ACTIVE (before 04:00)
-            # Example: start=20:00, current=12:00, end=04:00 → NOT ACTIVE (middle of day)
-            if current_time >= start or current_time < end:
-                active_list.append(checkpoint)
+    # CASE 2: Overnight shift (e.g., 8:00 PM to 4:00 AM next day)
+    # start >= end means the shift crosses midnight
+    # Active if: NOW is after start (before midnight) OR NOW is before end (after midnight)
+    # Example: start=20:00, current=22:00, end=04:00 → ACTIVE (after 20:00)
+    # Example: start=20:00, current=02:00, end=04:00 → ACTIVE (before 04:00)
+    # Example: start=20:00, current=12:00, end=04:00 → NOT ACTIVE (middle of day)
+    overnight = Q(time_start__gte=F('time_end')) & (Q(time_start__lte=current_time) | Q(time_end__gt=current_time))
 
-    return active_list
+    return checkpoints_qs.filter(same_day | overnight)
 
 
 
@@ -347,6 +581,49 @@ def parse_filters(request):
 
 
 
+@lru_cache(maxsize=1024)
+def convert_user_id_to_uuid(user_id):
+    """Convert user_id string from JWT to UUID for database filtering.
+
+    The same few office/admin ids come in on every request, so results are memoized.
+    """
+    if isinstance(user_id, uuid.UUID):
+        return user_id
+    if not user_id:
+        return None
+    try:
+        return uuid.UUID(user_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def build_scoped_report_qs(base_qs, user_id, role, f):
+    # FUNCTION: Restrict a report queryset to what the requester may see
+    # Input: Base QuerySet, JWT user_id + role, filter dict from parse_filters()
+    # Output: Scoped QuerySet (f['scope'] / f['office_id'] are normalized in place)
+    # Used by: Analytics + resolved-cases views (one place for the role rules)
+    # Rules:
+    # - police: may choose 'our_office' or 'all' via UI
+    # - admin: may choose 'our_office' + office_id, or 'all'
+    if role == 'police':
+        if f['scope'] == 'our_office':
+            office_uuid = convert_user_id_to_uuid(user_id)
+            if office_uuid:
+                base_qs = base_qs.filter(assigned_office_id=office_uuid)
+            f['scope'] = 'our_office'
+            f['office_id'] = str(user_id)
+        else:
+            # Scope = all (ignore office_id for police in this mode)
+            f['scope'] = 'all'
+            f['office_id'] = None
+    elif role == 'admin' and f['scope'] == 'our_office' and f['office_id']:
+        # Admin explicitly selected a specific office
+        admin_office_uuid = convert_user_id_to_uuid(f['office_id'])
+        if admin_office_uuid:
+            base_qs = base_qs.filter(assigned_office_id=admin_office_uuid)
+    return base_qs
+
+
 def apply_common_filters(qs, f):
     # FUNCTION: Apply all parsed filters to a queryset
     # Input: Django QuerySet, filter dict from parse_filters()
@@ -354,27 +631,31 @@ def apply_common_filters(qs, f):
     # Used by: All analytics views to apply consistent filtering logic
     # Example: start with all reports → filter by date → filter by location
     
+    # The conditions are collected into one Q and applied with a single .filter()
+    # (each .filter() call clones the whole queryset; the SQL is the same either way)
+    conditions = Q()
+
     # FILTER 1: Date range (reports created since the cutoff date)
     # Example: only show reports from the last 30 days
     if f.get('since') is not None:
-        qs = qs.filter(created_at__gte=f['since'])
+        conditions &= Q(created_at__gte=f['since'])
 
     # FILTER 2: Location (city and optionally barangay)
     # Case-insensitive matching ("manila" matches "Manila")
     if f['city']:
-        qs = qs.filter(location_city__iexact=f['city'])
+        conditions &= Q(location_city__iexact=f['city'])
         # If barangay is also specified, add that filter too
         if f['barangay']:
-            qs = qs.filter(location_barangay__iexact=f['barangay'])
+            conditions &= Q(location_barangay__iexact=f['barangay'])
 
     # FILTER 3: Crime category
     # Example: show only "Robbery" reports, case-insensitive
     if f['category']:
-        qs = qs.filter(category__iexact=f['category'])
+        conditions &= Q(category__iexact=f['category'])
 
     # Return the filtered queryset
     # Can be used directly or filtered further by the calling view
-    return qs
+    return qs.filter(conditions) if conditions else qs
 
 
 def apply_resolved_date_filter(qs, since):
@@ -403,13 +684,12 @@ def format_duration(delta):
     if not delta:
         return "N/A"
     
-    # Convert timedelta to total seconds (easier to do math with)
+    # Truncate to whole seconds first (toward zero, so a tiny negative delta
+    # still shows as 00:00:00), then split with integer math only
     total_seconds = int(delta.total_seconds())
-    
-    # Calculate days, hours, minutes, seconds from total seconds
-    days = total_seconds // 86400  # 86400 seconds in a day
-    rem = total_seconds % 86400  # Remaining seconds after extracting days
-    h, m, s = rem // 3600, (rem % 3600) // 60, rem % 60  # Extract h:m:s
+    days, rem = divmod(total_seconds, 86400)  # 86400 seconds in a day
+    h, rem = divmod(rem, 3600)  # 3600 seconds in an hour
+    m, s = divmod(rem, 60)  # Extract m:s
     
     # Format as string: "2d 03:45:30" (only show days if > 0)
     return (f"{days}d " if days else "") + f"{h:02d}:{m:02d}:{s:02d}"
@@ -446,8 +726,9 @@ def build_top_locations(base_qs, f):
     # Example: {Manila/Tondo: 50 reports (30%), Manila/Intramuros: 35 reports (21%), ...}
     
     # Apply all filters to get matching resolved reports (used for top locations table)
-    # NOTE: Use status__iexact to tolerate DB rows edited manually (case differences).
-    resolved_qs = base_qs.filter(status__iexact='Resolved')
+    # NOTE: status is report_status_enum, so an exact match is safe (no case variants can exist)
+    # and lets Postgres use the status indexes instead of scanning UPPER(status::text).
+    resolved_qs = base_qs.filter(status='Resolved')
     base = apply_common_filters(resolved_qs, f)
     # Use "resolved date" filtering instead of created_at for resolved analytics
     base = apply_resolved_date_filter(base, f.get('since'))
@@ -527,7 +808,7 @@ def build_category_concentration(base_qs, f):
     # Example: {Robbery: 85 reports (50%), Theft: 60 reports (35%), ...}
     
     # Apply all filters to get matching resolved reports
-    resolved_qs = base_qs.filter(status__iexact='Resolved')
+    resolved_qs = base_qs.filter(status='Resolved')
     base = apply_common_filters(resolved_qs, f)
     base = apply_resolved_date_filter(base, f.get('since'))
     total = base.count()  # Total number of matching reports
@@ -572,9 +853,73 @@ def build_category_concentration(base_qs, f):
 # Used by views to generate PDFs and format data for display
 # ============================================================================
 
-def render_pdf(template_name, context, base_url):
+# WeasyPrint rendering is CPU-heavy and holds the GIL for seconds on big reports.
+# Only let a couple of renders run at once per process so a burst of exports
+# can't starve every other request thread of CPU (extra exports just wait their turn).
+PDF_RENDER_CONCURRENCY = 2
+_pdf_render_slots = threading.BoundedSemaphore(PDF_RENDER_CONCURRENCY)
+
+
+# WeasyPrint builds a new fontconfig setup (scans every installed font) on each
+# write_pdf() unless it's given one. Build it once per render thread and reuse it.
+# Per thread, not global: fontconfig/Pango objects aren't safe to share between
+# the renders that run at the same time.
+_pdf_thread_state = threading.local()
+
+
+def _get_font_config():
+    font_config = getattr(_pdf_thread_state, 'font_config', None)
+    if font_config is None:
+        font_config = FontConfiguration()
+        _pdf_thread_state.font_config = font_config
+    return font_config
+
+
+PDF_PREFETCH_WORKERS = 4
+PDF_PREFETCH_TIMEOUT = 10  # seconds per image
+
+
+def _fetch_for_pdf(session, url):
+    # Download one remote asset (e.g. an evidence photo) for WeasyPrint; None if it fails
+    try:
+        res = session.get(url, timeout=PDF_PREFETCH_TIMEOUT)
+        res.raise_for_status()
+    except requests.RequestException as e:
+        logger.warning("PDF asset prefetch failed for %s: %s", url, e)
+        return None
+    mime_type = (res.headers.get('Content-Type') or '').split(';')[0].strip() or None
+    return {'string': res.content, 'mime_type': mime_type, 'redirected_url': res.url}
+
+
+def build_prefetching_url_fetcher(urls):
+    # FUNCTION: Download remote images all at once, before WeasyPrint starts
+    # Input: list of URLs the template will reference (e.g. Supabase media links)
+    # Output: url_fetcher for HTML(); serves prefetched bytes, anything else (or a
+    #         failed prefetch) goes through WeasyPrint's normal fetcher
+    # Why? WeasyPrint fetches <img> sources one by one while laying out the page,
+    # so 3 photos = 3 round-trips back to back. In parallel it's about one.
+    urls = [u for u in dict.fromkeys(urls) if u]
+    prefetched = {}
+    if urls:
+        with requests.Session() as session, ThreadPoolExecutor(
+            max_workers=min(PDF_PREFETCH_WORKERS, len(urls))
+        ) as pool:
+            for url, result in zip(urls, pool.map(lambda u: _fetch_for_pdf(session, u), urls)):
+                if result is not None:
+                    prefetched[url] = result
+
+    def url_fetcher(url, *args, **kwargs):
+        if url in prefetched:
+            return dict(prefetched[url])
+        return default_url_fetcher(url, *args, **kwargs)
+
+    return url_fetcher
+
+
+def render_pdf(template_name, context, base_url, prefetch_urls=None):
     # FUNCTION: Convert Django HTML template to PDF file
     # Input: template_name (e.g., "report_crime_deep_dive.html"), context data, base URL
+    #        prefetch_urls (optional) = remote images to download in parallel up front
     # Output: Binary PDF data (bytes) ready to send to browser
     # Used by: All export views to generate downloadable/viewable PDFs
     # How it works: Render template to HTML → convert HTML to PDF using WeasyPrint
@@ -582,11 +927,17 @@ def render_pdf(template_name, context, base_url):
     # Step 1: Render the Django template with the context data
     # This converts a .html template + Python dict → HTML string
     html = render_to_string(template_name, context)
+
+    # Network downloads happen before taking a render slot (they don't use CPU)
+    url_fetcher = build_prefetching_url_fetcher(prefetch_urls) if prefetch_urls else default_url_fetcher
     
     # Step 2: Convert HTML to PDF using WeasyPrint library
     # HTML() parses the HTML, write_pdf() generates PDF bytes
     # base_url is needed for resolving CSS/image paths in the template
-    return HTML(string=html, base_url=base_url).write_pdf()
+    with _pdf_render_slots:
+        return HTML(string=html, base_url=base_url, url_fetcher=url_fetcher).write_pdf(
+            font_config=_get_font_config()
+        )
 
 
 
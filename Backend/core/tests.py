@@ -1,3 +1,309 @@
-from django.test import TestCase
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import services
+from .models import Admin, Checkpoint, PoliceOffice, Report
+from .serializers import AdminUpdateSerializer
+from .services import filter_active_checkpoints, format_duration
+from .views import LOGIN_RATE_LIMIT
+
+
+# ============================================================================
+# format_duration: resolution time shown on the resolved cases list / PDF
+# ============================================================================
+
+class FormatDurationTests(SimpleTestCase):
+    def test_missing_delta(self):
+        self.assertEqual(format_duration(None), "N/A")
+
+    def test_days_and_time(self):
+        self.assertEqual(format_duration(timedelta(days=2, seconds=13530)), "2d 03:45:30")
+
+    def test_under_a_day_hides_days(self):
+        self.assertEqual(format_duration(timedelta(hours=1, minutes=2, seconds=3)), "01:02:03")
+
+    def test_sub_second_negative_truncates_to_zero(self):
+        self.assertEqual(format_duration(timedelta(seconds=-0.5)), "00:00:00")
+
+    def test_negative_truncates_toward_zero(self):
+        self.assertEqual(format_duration(-timedelta(hours=1, microseconds=1)), "-1d 23:00:00")
+
+
+# ============================================================================
+# filter_active_checkpoints: SQL version of the old get_active_checkpoints_list
+# ============================================================================
+
+def _old_active_names(checkpoints, now):
+    # The previous Python implementation, kept here as the reference behaviour
+    names = set()
+    for c in checkpoints:
+        start, end = c.time_start, c.time_end
+        if start is None or end is None:
+            continue
+        if start < end:
+            if start <= now < end:
+                names.add(c.checkpoint_name)
+        elif now >= start or now < end:
+            names.add(c.checkpoint_name)
+    return names
+
+
+class FilterActiveCheckpointsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def make(name, start, end):
+            Checkpoint.objects.create(
+                checkpoint_name=name, time_start=start, time_end=end,
+                latitude=Decimal('14.5995000'), longitude=Decimal('120.9842000'),
+            )
+        make('day', time(8, 0), time(17, 0))
+        make('overnight', time(20, 0), time(4, 0))
+        make('all_day', time(6, 0), time(6, 0))  # start == end counts as overnight
+        make('no_start', None, time(17, 0))
+        make('no_end', time(8, 0), None)
+        make('no_times', None, None)
+
+    def active_names_at(self, now):
+        fake_now = timezone.make_aware(datetime.combine(date(2026, 1, 1), now))
+        with patch.object(services.timezone, 'localtime', return_value=fake_now):
+            return set(filter_active_checkpoints(Checkpoint.objects.all()).values_list('checkpoint_name', flat=True))
+
+    def test_same_day_window(self):
+        self.assertIn('day', self.active_names_at(time(12, 0)))
+        self.assertNotIn('day', self.active_names_at(time(7, 59, 59)))
+        self.assertNotIn('day', self.active_names_at(time(17, 0, 1)))
+
+    def test_same_day_boundaries(self):
+        # start is inclusive, end is exclusive
+        self.assertIn('day', self.active_names_at(time(8, 0)))
+        self.assertNotIn('day', self.active_names_at(time(17, 0)))
+
+    def test_overnight_window(self):
+        self.assertIn('overnight', self.active_names_at(time(22, 0)))
+        self.assertIn('overnight', self.active_names_at(time(2, 0)))
+        self.assertNotIn('overnight', self.active_names_at(time(12, 0)))
+
+    def test_overnight_boundaries(self):
+        self.assertIn('overnight', self.active_names_at(time(20, 0)))
+        self.assertIn('overnight', self.active_names_at(time(3, 59, 59)))
+        self.assertNotIn('overnight', self.active_names_at(time(4, 0)))
+        self.assertNotIn('overnight', self.active_names_at(time(19, 59, 59)))
+
+    def test_null_times_never_match(self):
+        for now in (time(0, 0), time(8, 0), time(12, 0), time(23, 59, 59)):
+            self.assertFalse(self.active_names_at(now) & {'no_start', 'no_end', 'no_times'})
+
+    def test_matches_old_python_filter(self):
+        checkpoints = list(Checkpoint.objects.all())
+        for now in (
+            time(0, 0), time(3, 59, 59), time(4, 0), time(6, 0), time(7, 59, 59), time(8, 0),
+            time(12, 0), time(17, 0), time(19, 59, 59), time(20, 0), time(23, 59, 59),
+        ):
+            with self.subTest(now=now):
+                self.assertEqual(self.active_names_at(now), _old_active_names(checkpoints, now))
+
+
+# ============================================================================
+# LOGIN: one UNION ALL lookup across tbl_admin and tbl_police_offices
+# ============================================================================
+
+LOGIN_URL = '/api/v1/auth/login/'
+
+
+class LoginAPITests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Admin.objects.create(
+            admin_id=uuid.uuid4(), username='admin1', email='admin@crash.ph',
+            password=make_password('admin-pass'),
+        )
+        cls.office = PoliceOffice.objects.create(
+            office_name='Station 1', email='police@crash.ph', password_hash=make_password('police-pass'),
+            latitude=Decimal('14.5995000'), longitude=Decimal('120.9842000'), created_by=cls.admin,
+        )
+
+    def setUp(self):
+        # Rate-limit counters and cached password checks live in the cache
+        cache.clear()
+
+    def test_admin_login(self):
+        # 1 UNION ALL lookup + 1 fetch of the matched admin row for the response
+        with self.assertNumQueries(2):
+            response = self.client.post(LOGIN_URL, {'email': 'admin@crash.ph', 'password': 'admin-pass'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['role'], 'admin')
+        self.assertEqual(response.data['user']['admin_id'], str(self.admin.admin_id))
+        self.assertIn('access', response.data)
+
+    def test_police_login(self):
+        with self.assertNumQueries(2):
+            response = self.client.post(LOGIN_URL, {'email': 'police@crash.ph', 'password': 'police-pass'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['role'], 'police')
+        self.assertEqual(response.data['user']['office_id'], str(self.office.office_id))
+        self.assertEqual(response.data['user']['created_by_username'], 'admin1')
+
+    def test_unknown_user(self):
+        # Unknown emails cost a single query and no password hashing
+        with self.assertNumQueries(1):
+            response = self.client.post(LOGIN_URL, {'email': 'nobody@crash.ph', 'password': 'whatever'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_wrong_password(self):
+        response = self.client.post(LOGIN_URL, {'email': 'admin@crash.ph', 'password': 'wrong'})
+        self.assertEqual(response.status_code, 401)
+
+
+class LoginRateLimitTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Admin.objects.create(
+            admin_id=uuid.uuid4(), username='admin1', email='admin@crash.ph',
+            password=make_password('admin-pass'),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_attempt_over_the_limit_gets_429(self):
+        payload = {'email': 'nobody@crash.ph', 'password': 'whatever'}
+        for _ in range(LOGIN_RATE_LIMIT):
+            self.assertEqual(self.client.post(LOGIN_URL, payload).status_code, 401)
+        # The (N+1)th attempt is rejected before any DB lookup
+        with self.assertNumQueries(0):
+            response = self.client.post(LOGIN_URL, payload)
+        self.assertEqual(response.status_code, 429)
+
+    def test_successful_logins_do_not_count(self):
+        payload = {'email': 'admin@crash.ph', 'password': 'admin-pass'}
+        for _ in range(LOGIN_RATE_LIMIT + 1):
+            self.assertEqual(self.client.post(LOGIN_URL, payload).status_code, 200)
+
+    def test_limit_is_per_email(self):
+        # Behind a proxy every client shares REMOTE_ADDR; one email's failures
+        # must not lock out everyone else
+        for _ in range(LOGIN_RATE_LIMIT + 1):
+            self.client.post(LOGIN_URL, {'email': 'nobody@crash.ph', 'password': 'whatever'})
+        response = self.client.post(LOGIN_URL, {'email': 'admin@crash.ph', 'password': 'admin-pass'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_limit_is_per_ip(self):
+        payload = {'email': 'nobody@crash.ph', 'password': 'whatever'}
+        for _ in range(LOGIN_RATE_LIMIT + 1):
+            self.client.post(LOGIN_URL, payload, REMOTE_ADDR='10.0.0.1')
+        response = self.client.post(LOGIN_URL, payload, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 401)
+
+
+# ============================================================================
+# AdminUpdateSerializer: username/email uniqueness checked in one query
+# ============================================================================
+
+class AdminUpdateSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.me = Admin.objects.create(admin_id=uuid.uuid4(), username='me', email='me@crash.ph', password='x')
+        cls.other = Admin.objects.create(admin_id=uuid.uuid4(), username='other', email='other@crash.ph', password='x')
+
+    def validate(self, data):
+        serializer = AdminUpdateSerializer(self.me, data=data, partial=True, context={'current_admin': self.me})
+        with self.assertNumQueries(1):
+            valid = serializer.is_valid()
+        return valid, serializer.errors
+
+    def test_email_taken_by_another_admin(self):
+        valid, errors = self.validate({'email': 'other@crash.ph'})
+        self.assertFalse(valid)
+        self.assertEqual(errors['email'], [AdminUpdateSerializer.UNIQUE_FIELD_ERRORS['email']])
+        self.assertNotIn('username', errors)
+
+    def test_username_taken_by_another_admin(self):
+        valid, errors = self.validate({'username': 'other'})
+        self.assertFalse(valid)
+        self.assertEqual(errors['username'], [AdminUpdateSerializer.UNIQUE_FIELD_ERRORS['username']])
+        self.assertNotIn('email', errors)
+
+    def test_both_taken_reports_both(self):
+        third = Admin.objects.create(admin_id=uuid.uuid4(), username='third', email='third@crash.ph', password='x')
+        valid, errors = self.validate({'username': 'other', 'email': third.email})
+        self.assertFalse(valid)
+        self.assertEqual(set(errors), {'username', 'email'})
+
+    def test_keeping_own_username_and_email(self):
+        valid, errors = self.validate({'username': 'me', 'email': 'me@crash.ph', 'contact': '09171234567'})
+        self.assertTrue(valid, errors)
+
+    def test_contact_only_update_skips_the_query(self):
+        serializer = AdminUpdateSerializer(self.me, data={'contact': '09171234567'}, partial=True, context={'current_admin': self.me})
+        with self.assertNumQueries(0):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+# ============================================================================
+# PAGINATION: opt-in with ?page=N (resolved lists only)
+# ============================================================================
+
+class OptionalPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Admin.objects.create(admin_id=uuid.uuid4(), username='admin1', email='admin@crash.ph', password='x')
+        now = timezone.now()
+        for i, report_status in enumerate(['Resolved', 'Resolved', 'Resolved', 'Pending']):
+            Report.objects.create(
+                category='Theft', status=report_status, updated_at=now - timedelta(minutes=i),
+                latitude=Decimal('14.5995000'), longitude=Decimal('120.9842000'),
+            )
+
+    def setUp(self):
+        cache.clear()
+        token = AccessToken()
+        token['user_id'] = str(self.admin.admin_id)
+        token['role'] = 'admin'
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def assert_opt_in_pagination(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 3)
+
+        response = self.client.get(url, {'page': 1, 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_summary_resolved(self):
+        self.assert_opt_in_pagination('/api/v1/reports/summary_resolved/')
+
+    def test_resolved_cases(self):
+        # This endpoint always wraps rows in {filters, count, results}; ?page adds next/previous
+        url = '/api/v1/reports/resolved/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertNotIn('next', response.data)
+
+        response = self.client.get(url, {'page': 1, 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_report_list_ignores_page(self):
+        response = self.client.get('/api/v1/reports/', {'page': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 1)
@@ -4,21 +4,31 @@
 # Each view = one endpoint. Views are like "recipe executors" for API endpoints.
 # ============================================================================
 
-from datetime import datetime, timedelta
+from datetime import timedelta
+import hashlib
+import hmac
+import json
 import uuid as uuid_module
 
-from django.http import HttpResponse
-from django.db import transaction
-from django.db.models import Count, F, Value, Q
-from django.db.models.functions import Coalesce
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db import IntegrityError, connection, transaction
+from django.db.models import CharField, Count, F, Value, Q
+from django.db.models.functions import Greatest
 from django.core.cache import cache
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
 from rest_framework import status, viewsets, serializers
 from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
 from ..models import (
     Admin,
@@ -30,6 +40,8 @@ from ..models import (
     SummaryAnalytics,
     User,
 )
+from ..pagination import OptionalPageNumberPagination
+from ..renderers import ORJSONRenderer
 from ..serializers import (
     AdminSerializer,
     AdminUpdateSerializer,
@@ -49,9 +61,15 @@ from ..services import (
     generate_directions_and_qr,
     reverse_geocode,
     reverse_geocode_address,
-    get_active_checkpoints_list,
+    filter_active_checkpoints,
     find_nearest_office,
-    assign_nearest_office_for_unassigned,
+    forget_default_office,
+    forget_office_footer,
+    geocode_office,
+    get_default_office_id,
+    increment_summary_analytics,
+    rebuild_summary_analytics,
+    run_in_background,
 )
 
 
@@ -59,6 +77,10 @@ from ..services import (
 # HELPER: Manual JWT Validation
 # ============================================================================
 
+# How long a verified token is remembered across requests (seconds)
+JWT_CACHE_TTL = 60
+
+
 def validate_jwt_token(request):
     """
     Manually validate JWT token from Authorization header.
@@ -66,20 +88,36 @@ def validate_jwt_token(request):
     
     Since we disabled default JWT authentication to avoid User model conflicts,
     we validate tokens manually in views that need authentication.
+
+    The result is remembered on the request (request._jwt_claims), so calling
+    this again during the same request doesn't decode the token twice.
+    Valid tokens are also cached for up to JWT_CACHE_TTL seconds (keyed by a
+    hash of the token), so dashboard polling doesn't re-verify every call.
     """
-    from rest_framework_simplejwt.tokens import AccessToken
-    from rest_framework_simplejwt.exceptions import TokenError
-    
+    cached = getattr(request, '_jwt_claims', None)
+    if cached is not None:
+        return cached
+
     # Get Authorization header
     auth_header = request.headers.get('Authorization')
     
     if not auth_header or not auth_header.startswith('Bearer '):
-        return False, None, None, Response({
+        result = (False, None, None, Response({
             'detail': 'Authentication credentials were not provided.'
-        }, status=status.HTTP_401_UNAUTHORIZED)
+        }, status=status.HTTP_401_UNAUTHORIZED))
+        request._jwt_claims = result
+        return result
     
-    # Extract token
-    token_str = auth_header.split(' ')[1]
+    # Extract token (everything after "Bearer ")
+    token_str = auth_header[7:]
+
+    # Seen this exact token recently? (never store the raw token as the key)
+    cache_key = 'jwt:' + hashlib.blake2b(token_str.encode(), digest_size=16).hexdigest()
+    claims = cache.get(cache_key)
+    if claims is not None:
+        result = (True, claims[0], claims[1], None)
+        request._jwt_claims = result
+        return result
     
     try:
         # Decode and validate token
@@ -89,12 +127,174 @@ def validate_jwt_token(request):
         user_id = token.get('user_id')
         role = token.get('role')
         
-        return True, user_id, role, None
+        result = (True, user_id, role, None)
+
+        # Cache no longer than the token itself is valid
+        ttl = min(JWT_CACHE_TTL, int(token['exp'] - timezone.now().timestamp()))
+        if ttl > 0:
+            cache.set(cache_key, (user_id, role), timeout=ttl)
         
     except TokenError as e:
-        return False, None, None, Response({
+        result = (False, None, None, Response({
             'detail': 'Invalid or expired token.'
-        }, status=status.HTTP_401_UNAUTHORIZED)
+        }, status=status.HTTP_401_UNAUTHORIZED))
+
+    request._jwt_claims = result
+    return result
+
+
+def get_token_uuid(request, user_id):
+    """
+    Convert the JWT user_id string to a UUID (None if missing/invalid).
+    JWT stores UUIDs as strings, but Django needs proper UUID type for FK filtering.
+    Parsed once per request and remembered on request._token_uuid.
+    """
+    if not hasattr(request, '_token_uuid'):
+        try:
+            request._token_uuid = uuid_module.UUID(user_id) if user_id else None
+        except (ValueError, TypeError):
+            request._token_uuid = None
+    return request._token_uuid
+
+
+def get_request_admin(request, user_id):
+    """
+    Admin row for the token's admin_id (None if not found), loaded at most
+    once per request and remembered on request._admin - like DRF's request.user.
+    """
+    if not hasattr(request, '_admin'):
+        admin_uuid = get_token_uuid(request, user_id)
+        request._admin = Admin.objects.filter(admin_id=admin_uuid).first() if admin_uuid else None
+    return request._admin
+
+
+# ============================================================================
+# HELPER: Streamed JSON for large list payloads
+# ============================================================================
+
+# How many rows we pull from the database (and serialize) at a time.
+# Memory stays O(chunk) instead of O(all rows) for big map payloads.
+STREAM_CHUNK_SIZE = 500
+
+
+def iter_serialized_chunks(queryset, serializer_class, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield serialized lists of at most chunk_size rows from a queryset.
+
+    Uses queryset.iterator() so Django does not cache every model instance.
+    Plain lists (already fetched rows) are also accepted.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size) if hasattr(queryset, 'iterator') else queryset
+    batch = []
+    for obj in rows:
+        batch.append(obj)
+        if len(batch) >= chunk_size:
+            yield serializer_class(batch, many=True).data
+            batch = []
+    if batch:
+        yield serializer_class(batch, many=True).data
+
+
+def stream_json_object(sections):
+    """Yield a JSON object piece by piece.
+
+    sections = list of (key, queryset, serializer_class). Each key becomes a
+    JSON array built from iter_serialized_chunks(), so the response body is
+    identical to Response({key: serializer(qs, many=True).data, ...}).
+    """
+    renderer = ORJSONRenderer()
+    yield '{'
+    for index, (key, queryset, serializer_class) in enumerate(sections):
+        if index:
+            yield ','
+        yield json.dumps(key) + ':['
+        first = True
+        for rows in iter_serialized_chunks(queryset, serializer_class):
+            if not rows:
+                continue
+            # Strip the outer [ ] so consecutive chunks join into one array
+            body = renderer.render(rows)[1:-1]
+            if not first:
+                yield ','
+            yield body
+            first = False
+        yield ']'
+    yield '}'
+
+
+# ============================================================================
+# HELPER: Short-lived password check cache (login)
+# ============================================================================
+
+# check_password() is intentionally slow (Argon2/PBKDF2). Bots retrying the same
+# email + password would make us re-hash identical input over and over.
+# We remember the result for a few seconds only.
+PASSWORD_CHECK_CACHE_TTL = 5  # seconds
+
+
+def check_password_cached(password, encoded):
+    """check_password() with a tiny TTL cache in front of it.
+
+    The cache key is an HMAC of the plain password + the stored hash, so the
+    plain password is never stored, and changing the password (new hash)
+    automatically invalidates old entries.
+    """
+    if not isinstance(password, str) or not encoded:
+        return check_password(password, encoded)
+
+    digest = hmac.new(
+        (settings.SECRET_KEY or '').encode(),
+        f"{encoded}:{password}".encode(),
+        hashlib.sha256,
+    ).hexdigest()
+    cache_key = f"login_pw_check:{digest}"
+
+    result = cache.get(cache_key)
+    if result is None:
+        result = check_password(password, encoded)
+        cache.set(cache_key, result, timeout=PASSWORD_CHECK_CACHE_TTL)
+    return result
+
+
+# Password hashing is deliberately CPU-heavy, and our WSGI workers are
+# synchronous: a burst of login attempts from one client would keep every
+# worker busy hashing. Each (IP, email) pair gets a small number of FAILED
+# attempts per minute. The email is part of the key because behind Render's
+# proxy REMOTE_ADDR is the same for everyone; successful logins don't count.
+LOGIN_RATE_LIMIT = 10    # failed attempts
+LOGIN_RATE_WINDOW = 60   # seconds
+
+# Same idea for the admin tools that hash a password (per admin account)
+PASSWORD_HASH_RATE_LIMIT = 10  # hashes per minute
+
+
+def rate_limited(scope, ident, limit, window=60):
+    """Count one call for (scope, ident); True if over `limit` calls per `window` seconds."""
+    key = f"{scope}_rate:{ident}"
+    # add() only sets the key if missing, so the window starts at the first attempt
+    cache.add(key, 0, timeout=window)
+    try:
+        attempts = cache.incr(key)
+    except ValueError:
+        # Key expired between add() and incr()
+        cache.set(key, 1, timeout=window)
+        attempts = 1
+    return attempts > limit
+
+
+def _login_rate_ident(request, email):
+    ip = request.META.get('REMOTE_ADDR') or 'unknown'
+    return f"{ip}:{email.lower()}"
+
+
+def login_rate_limited(request, email):
+    """True if this IP + email already used up its failed attempts (doesn't count one)."""
+    key = f"login_rate:{_login_rate_ident(request, email)}"
+    return (cache.get(key) or 0) >= LOGIN_RATE_LIMIT
+
+
+def record_failed_login(request, email):
+    """Count one failed login for this IP + email."""
+    rate_limited('login', _login_rate_ident(request, email), LOGIN_RATE_LIMIT, LOGIN_RATE_WINDOW)
 
 
 # ============================================================================
@@ -109,13 +309,11 @@ class LoginAPIView(APIView):
     Output: User data, role (admin/police), JWT access/refresh tokens
     
     Password security: Uses Django's check_password() with hashed passwords
+    (through check_password_cached, which skips re-hashing identical retries for a few seconds)
     Token: Returns JWT tokens for authenticated requests
     """
 
     def post(self, request):
-        from django.contrib.auth.hashers import check_password
-        from rest_framework_simplejwt.tokens import RefreshToken
-        
         # Get email and password from request body
         email = request.data.get('email')
         password = request.data.get('password')
@@ -132,15 +330,41 @@ class LoginAPIView(APIView):
                 "detail": "Email and password are required."
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        # Reject floods before doing any DB lookup or password hashing
+        if login_rate_limited(request, email):
+            return Response({
+                "detail": "Too many login attempts. Please wait a minute and try again."
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
         password_stripped = password.strip() if isinstance(password, str) else password
 
-        # Try Admin login first: search database for admin with this email
-        try:
-            admin_user = Admin.objects.get(email=email)
+        # Look up the email in BOTH account tables with one query (UNION ALL)
+        # Each row = (account id, stored password hash, role)
+        # Admin rows come first, same priority as before (admin, then police).
+        accounts = sorted(
+            Admin.objects.filter(email=email)
+            .annotate(account_role=Value('admin', output_field=CharField()))
+            .values_list('admin_id', 'password', 'account_role')
+            .union(
+                PoliceOffice.objects.filter(email=email)
+                .annotate(account_role=Value('police', output_field=CharField()))
+                .values_list('office_id', 'password_hash', 'account_role'),
+                all=True,
+            ),
+            key=lambda row: row[2] != 'admin',
+        )
+
+        for account_id, encoded, account_role in accounts:
             # Check password against hashed password in database
-            if check_password(password, admin_user.password) or (
-                isinstance(password, str) and password != password_stripped and check_password(password_stripped, admin_user.password)
-            ):
+            if not (check_password_cached(password, encoded) or (
+                isinstance(password, str) and password != password_stripped and check_password_cached(password_stripped, encoded)
+            )):
+                continue
+
+            if account_role == 'admin':
+                admin_user = Admin.objects.filter(admin_id=account_id).first()
+                if admin_user is None:
+                    continue
                 # Generate JWT tokens for this user
                 # RefreshToken generates both access and refresh tokens
                 refresh = RefreshToken()
@@ -158,38 +382,29 @@ class LoginAPIView(APIView):
                     "access": str(refresh.access_token),   # JWT access token
                     "refresh": str(refresh),               # JWT refresh token
                 }, status=status.HTTP_200_OK)
-        except Admin.DoesNotExist:
-            # Email not found in Admin table, try Police next
-            pass
 
-        # Try Police login: search database for police office with this email
-        try:
-            police_office = PoliceOffice.objects.get(email=email)
-            # Check password against hashed password in database
-            if check_password(password, police_office.password_hash) or (
-                isinstance(password, str) and password != password_stripped and check_password(password_stripped, police_office.password_hash)
-            ):
-                # Generate JWT tokens for this police office
-                refresh = RefreshToken()
-                refresh['user_id'] = str(police_office.office_id)
-                refresh['role'] = 'police'
-                refresh['email'] = police_office.email
-                
-                # Serialize police office data (excludes password)
-                serializer = PoliceOfficeLoginSerializer(police_office)
-                
-                return Response({
-                    "message": "Police login successful",
-                    "role": "police",
-                    "user": serializer.data,
-                    "access": str(refresh.access_token),   # JWT access token
-                    "refresh": str(refresh),               # JWT refresh token
-                }, status=status.HTTP_200_OK)
-        except PoliceOffice.DoesNotExist:
-            # Email not found in either table = invalid credentials
-            pass
+            police_office = PoliceOffice.objects.select_related('created_by').filter(office_id=account_id).first()
+            if police_office is None:
+                continue
+            # Generate JWT tokens for this police office
+            refresh = RefreshToken()
+            refresh['user_id'] = str(police_office.office_id)
+            refresh['role'] = 'police'
+            refresh['email'] = police_office.email
+            
+            # Serialize police office data (excludes password)
+            serializer = PoliceOfficeLoginSerializer(police_office)
+            
+            return Response({
+                "message": "Police login successful",
+                "role": "police",
+                "user": serializer.data,
+                "access": str(refresh.access_token),   # JWT access token
+                "refresh": str(refresh),               # JWT refresh token
+            }, status=status.HTTP_200_OK)
 
         # Fallback: credentials didn't match any user or password was wrong
+        record_failed_login(request, email)
         return Response({
             "detail": "Invalid credentials."
         }, status=status.HTTP_401_UNAUTHORIZED)
@@ -238,26 +453,25 @@ class PoliceOfficeAdminViewSet(viewsets.ModelViewSet):
 
         office = serializer.save(created_by=admin_instance)
 
-        # Auto-geocode office location (city/barangay) using the existing helper
-        try:
-            city, barangay = reverse_geocode(office.latitude, office.longitude)
-            office.location_city = city
-            office.location_barangay = barangay
-            office.save(update_fields=['location_city', 'location_barangay'])
-        except Exception:
-            # Don't block creation if geocoding fails (API key/quota/network)
-            pass
+        # Auto-geocode office location (city/barangay) in the background so the
+        # admin doesn't wait on the Google API. Failures are logged, never block creation.
+        run_in_background(geocode_office, office.office_id)
 
     def perform_update(self, serializer):
+        coords_changed = 'latitude' in serializer.validated_data or 'longitude' in serializer.validated_data
         office = serializer.save()
-        # If coordinates changed, refresh cached city/barangay
-        try:
-            city, barangay = reverse_geocode(office.latitude, office.longitude)
-            office.location_city = city
-            office.location_barangay = barangay
-            office.save(update_fields=['location_city', 'location_barangay'])
-        except Exception:
-            pass
+        # Name / head officer may have changed: drop the cached PDF footer
+        forget_office_footer(office.office_id)
+        # If coordinates changed (or were never geocoded), refresh cached city/barangay
+        if coords_changed or not office.location_city:
+            run_in_background(geocode_office, office.office_id)
+
+    def perform_destroy(self, instance):
+        office_id = instance.office_id
+        super().perform_destroy(instance)
+        # The deleted office may be the cached fallback office for new reports
+        forget_default_office()
+        forget_office_footer(office_id)
 
     def get_queryset(self):
         qs = super().get_queryset().select_related('created_by')
@@ -372,30 +586,42 @@ class ReportViewSet(viewsets.ModelViewSet):
         queryset = self.queryset
         
         if self.request.method == 'GET':
-            # Opportunistically assign nearest office for any unassigned reports
-            try:
-                assign_nearest_office_for_unassigned()
-            except Exception:
-                pass
-            
+            # NOTE: Nearest-office assignment happens when a report is created
+            # (perform_create / mobile endpoint). Leftover unassigned rows are
+            # fixed by `python manage.py assign_unassigned_reports`, not here.
+
             # Filter by office for police users (admin sees all)
             user_role = getattr(self.request, 'user_role', None)
             user_id = getattr(self.request, 'user_id', None)
             
             if user_role == 'police' and user_id:
-                # Get office for this police user
-                try:
-                    office = PoliceOffice.objects.get(office_id=user_id)
-                    queryset = queryset.filter(assigned_office=office)
-                except PoliceOffice.DoesNotExist:
-                    pass
+                # Get office for this police user (looked up once per request;
+                # DRF may call get_queryset more than once)
+                if not hasattr(self.request, '_police_office_id'):
+                    self.request._police_office_id = (
+                        PoliceOffice.objects.filter(office_id=user_id)
+                        .values_list('office_id', flat=True)
+                        .first()
+                    )
+                office_id = self.request._police_office_id
+                if office_id:
+                    queryset = queryset.filter(assigned_office_id=office_id)
+
+            # List/Detail/Resolved only need the columns ReportListSerializer reads.
+            # No prefetch of media/messages: the serializer doesn't include them,
+            # the frontend loads them from /reports/{id}/media/ and /messages/.
+            if getattr(self, 'action', None) in ('list', 'retrieve', 'summary_resolved'):
+                queryset = ReportListSerializer.setup_eager_loading(queryset)
 
             # IMPORTANT:
             # - For list views (Dashboard/Map), hide resolved/canceled.
             # - For retrieve view (View Details) we MUST allow resolved reports too,
             #   otherwise Resolved Cases page can't open the details modal.
+            # - summary_resolved is the opposite of list: ONLY resolved, newest first.
             if getattr(self, 'action', None) == 'list':
                 return queryset.exclude(status__in=['Resolved', 'Canceled']).order_by('-created_at')
+            if getattr(self, 'action', None) == 'summary_resolved':
+                return queryset.filter(status='Resolved').order_by('-updated_at')
 
             return queryset.order_by('-created_at')
         
@@ -409,20 +635,22 @@ class ReportViewSet(viewsets.ModelViewSet):
         latitude = self.request.data.get('latitude')
         longitude = self.request.data.get('longitude')
         
-        # Convert GPS coordinates to human-readable city/barangay names
-        location_city, location_barangay = reverse_geocode(latitude, longitude)
+        # Use the city/barangay the client already resolved (via /reverse-geocode/)
+        # when both are present; only call Google when one is missing.
+        location_city = (serializer.validated_data.get('location_city') or '').strip()
+        location_barangay = (serializer.validated_data.get('location_barangay') or '').strip()
+        if not (location_city and location_barangay):
+            # Convert GPS coordinates to human-readable city/barangay names
+            location_city, location_barangay = reverse_geocode(latitude, longitude)
 
         # Assign nearest office, fallback to first available if none found
+        # (fallback id is cached, so no extra office query per report)
         assigned_office_instance = find_nearest_office(latitude, longitude)
-        if not assigned_office_instance:
-            try:
-                assigned_office_instance = PoliceOffice.objects.all().first()
-            except PoliceOffice.DoesNotExist:
-                assigned_office_instance = None
+        assigned_office_id = assigned_office_instance.office_id if assigned_office_instance else get_default_office_id()
 
         # Save the report with auto-calculated fields
         serializer.save(
-            assigned_office=assigned_office_instance,
+            assigned_office_id=assigned_office_id,
             reporter_id=reporter_id,
             location_city=location_city,
             location_barangay=location_barangay,
@@ -448,19 +676,20 @@ class ReportViewSet(viewsets.ModelViewSet):
         def _bump_summary(city, barangay, category, delta):
             if not city or not barangay or not category:
                 return
-            with transaction.atomic():
-                obj, created = SummaryAnalytics.objects.select_for_update().get_or_create(
-                    location_city=city,
-                    location_barangay=barangay,
-                    category=category,
-                    defaults={'report_count': 0},
-                )
-                SummaryAnalytics.objects.filter(summary_id=obj.summary_id).update(
-                    report_count=F('report_count') + delta,
-                    last_updated=timezone.now(),
-                )
-                # Prevent negative counts if someone toggles status back and forth
-                SummaryAnalytics.objects.filter(summary_id=obj.summary_id, report_count__lt=0).update(report_count=0)
+            if delta > 0:
+                # Single UPSERT: creates the row for the first resolved report here
+                increment_summary_analytics(city, barangay, category, delta)
+                return
+            # One atomic UPDATE (no row lock needed: F() math happens inside the DB).
+            # Greatest(..., 0) prevents negative counts if someone toggles status back and forth.
+            SummaryAnalytics.objects.filter(
+                location_city=city,
+                location_barangay=barangay,
+                category=category,
+            ).update(
+                report_count=Greatest(F('report_count') + delta, Value(0)),
+                last_updated=timezone.now(),
+            )
 
         # If report just became Resolved → increment
         if prev_status != 'Resolved' and new_status == 'Resolved':
@@ -496,26 +725,29 @@ class ReportViewSet(viewsets.ModelViewSet):
 
     # Custom action: GET /reports/summary_resolved/
     # Returns all resolved reports (for resolved cases page)
+    # Add ?page=N (and optionally ?page_size=) to get one page at a time
     @action(detail=False, methods=['get'])
     def summary_resolved(self, request):
-        # Validate JWT and filter by office
+        # Validate JWT (same as list/retrieve)
         is_valid, user_id, role, error_response = validate_jwt_token(request)
         if not is_valid:
             return error_response
-        
-        # Start with resolved reports
-        resolved_reports = self.queryset.filter(status='Resolved')
-        
-        # Filter by office for police users (admin sees all)
-        if role == 'police' and user_id:
-            try:
-                office = PoliceOffice.objects.get(office_id=user_id)
-                resolved_reports = resolved_reports.filter(assigned_office=office)
-            except PoliceOffice.DoesNotExist:
-                pass
-        
-        # Sort by most recent first
-        resolved_reports = resolved_reports.order_by('-updated_at')
+
+        # Store user info for get_queryset, which does the office filtering,
+        # eager loading and "resolved, most recent first" for this action
+        request.user_id = user_id
+        request.user_role = role
+        resolved_reports = self.get_queryset()
+
+        # Optional pagination: ?page=N returns one page (50 rows by default)
+        # instead of the whole resolved history. Only this action paginates;
+        # the main /reports/ list always returns the plain array.
+        paginator = OptionalPageNumberPagination()
+        page = paginator.paginate_queryset(resolved_reports, request, view=self)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
         serializer = self.get_serializer(resolved_reports, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -576,10 +808,9 @@ class CheckpointViewSet(viewsets.ModelViewSet):
     # Returns only checkpoints that are currently active (right now)
     @action(detail=False, methods=['get'])
     def active(self, request):
-        # Get all checkpoints from database
-        all_checkpoints = self.queryset
-        # Filter to only those currently active (helper function checks time_start/time_end)
-        active_checkpoints = get_active_checkpoints_list(all_checkpoints)
+        # Only currently active checkpoints are fetched (time check runs in SQL),
+        # so select_related('office') only joins rows we actually return
+        active_checkpoints = filter_active_checkpoints(self.queryset)
         # Serialize and return the active ones
         serializer = self.get_serializer(active_checkpoints, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -621,7 +852,7 @@ class MediaViewSet(viewsets.ModelViewSet):
     # Output: File URL (stored in Supabase cloud) and metadata
     # Key feature: Files upload to cloud storage, not local disk
 
-    queryset = Media.objects.all().select_related('report')
+    # No class-level queryset: get_queryset() builds the one query we need.
     serializer_class = MediaSerializer
     parser_classes = [MultiPartParser, FormParser]
 
@@ -644,19 +875,22 @@ class MediaViewSet(viewsets.ModelViewSet):
 
         # Police may only upload evidence for reports assigned to their office.
         if role == 'police' and user_id:
-            try:
-                office_uuid = uuid_module.UUID(user_id)
-            except (ValueError, TypeError):
+            office_uuid = get_token_uuid(request, user_id)
+            if office_uuid is None:
                 return Response({"detail": "Invalid police office ID in token. Please log in again."}, status=status.HTTP_401_UNAUTHORIZED)
 
             report_id = request.data.get('report')
             if report_id:
-                try:
-                    report_obj = Report.objects.select_related('assigned_office').get(report_id=report_id)
-                    if not report_obj.assigned_office_id or report_obj.assigned_office_id != office_uuid:
-                        return Response({"detail": "You can only upload media for reports assigned to your office."}, status=status.HTTP_403_FORBIDDEN)
-                except Report.DoesNotExist:
+                # Only the office column is needed (no JOIN, no full Report object).
+                # [:1] instead of .first() so "no such report" and "report has no
+                # office" stay different answers.
+                assigned = list(
+                    Report.objects.filter(report_id=report_id).values_list('assigned_office_id', flat=True)[:1]
+                )
+                if not assigned:
                     return Response({"detail": "Report not found."}, status=status.HTTP_404_NOT_FOUND)
+                if assigned[0] != office_uuid:
+                    return Response({"detail": "You can only upload media for reports assigned to your office."}, status=status.HTTP_403_FORBIDDEN)
 
         return super().create(request, *args, **kwargs)
 
@@ -672,22 +906,28 @@ class MediaViewSet(viewsets.ModelViewSet):
     # Override: filter media by report_id if provided in query string
     # Usage: GET /media/?report_id=123 returns only files for that report
     def get_queryset(self):
-        queryset = Media.objects.all().select_related('report').order_by('-uploaded_at')
+        # MediaSerializer only needs report_id (not the whole report row),
+        # so there is no select_related here. All filters are applied in ONE
+        # .filter() call so the office check shares a single JOIN on tbl_reports.
+        queryset = Media.objects.order_by('-uploaded_at')
+        filters = {}
+
         # Check if frontend passed report_id as a query parameter
         report_id = self.request.query_params.get('report_id')
         if report_id:
             # Filter to only files attached to this report
-            queryset = queryset.filter(report_id=report_id)
+            filters['report_id'] = report_id
 
         # Scope media to the requesting police office (admin sees all)
         role = getattr(self.request, 'user_role', None)
         user_id = getattr(self.request, 'user_id', None)
         if role == 'police' and user_id:
-            try:
-                office_uuid = uuid_module.UUID(user_id)
-                queryset = queryset.filter(report__assigned_office_id=office_uuid)
-            except (ValueError, TypeError):
-                pass
+            office_uuid = get_token_uuid(self.request, user_id)
+            if office_uuid:
+                filters['report__assigned_office_id'] = office_uuid
+
+        if filters:
+            queryset = queryset.filter(**filters)
         return queryset
 
 
@@ -703,8 +943,13 @@ class TopLocationsAPIView(APIView):
     # Note: Groups by city/barangay/category combination
 
     def get(self, request):
-        # Start with all resolved reports
-        queryset = Report.objects.filter(status='Resolved')
+        # Start with all resolved reports that have a geocoded city
+        # (filtered in the database, before grouping, so the top 10 are all usable)
+        queryset = (
+            Report.objects.filter(status='Resolved')
+            .exclude(location_city__isnull=True)
+            .exclude(location_city='')
+        )
         
         # Optional filter: by crime category
         category = request.query_params.get('category')
@@ -714,7 +959,7 @@ class TopLocationsAPIView(APIView):
         # Optional filter: by date range (default: all time)
         date_range = request.query_params.get('date_range')
         if date_range == '30_days':
-            date_cutoff = datetime.now() - timedelta(days=30)
+            date_cutoff = timezone.now() - timedelta(days=30)
             queryset = queryset.filter(created_at__gte=date_cutoff)
 
         # Group reports by location and category, count how many in each group
@@ -725,17 +970,8 @@ class TopLocationsAPIView(APIView):
             'category'
         ).annotate(report_count=Count('report_id')).order_by('-report_count')[:10]  # Top 10 only
 
-        # Format the data for JSON response
-        results = [
-            {
-                'location_city': item['location_city'],
-                'location_barangay': item['location_barangay'],
-                'category': item['category'],
-                'report_count': item['report_count'],
-            }
-            for item in aggregated_data
-            if item['location_city']  # Skip if location is missing
-        ]
+        # .values() rows already have exactly the keys the frontend expects
+        results = list(aggregated_data)
 
         return Response(results, status=status.HTTP_200_OK)
 
@@ -744,12 +980,15 @@ class TopLocationsAPIView(APIView):
 # ADMIN MAP VIEW (Dashboard Map)
 # ============================================================================
 
+# gzip the (large, very repetitive) JSON when the browser sends Accept-Encoding: gzip
+@method_decorator(gzip_page, name='dispatch')
 class AdminMapAPIView(APIView):
     # ENDPOINT: GET /admin/map/data/
     # Used when: Admin/Police dashboard loads the interactive map
     # Query Parameters:
     #   - scope_reports: 'our_office' or 'all' (default: 'our_office' for police, 'all' for admin)
     #   - scope_checkpoints: 'our_office' or 'all' (default: 'our_office' for police, 'all' for admin)
+    #   - since: optional ISO datetime; only reports created at/after it (default: all)
     # Output: All active reports + all police offices + checkpoints
     # Purpose: Shows real-time crime incidents, police locations, and patrols on a map
 
@@ -760,15 +999,14 @@ class AdminMapAPIView(APIView):
             return error_response
         
         # Convert user_id string to UUID for database filtering
-        # JWT stores UUIDs as strings, but Django needs proper UUID type for FK filtering
-        office_uuid = None
-        if user_id:
-            try:
-                office_uuid = uuid_module.UUID(user_id)
-            except (ValueError, TypeError):
-                pass
+        office_uuid = get_token_uuid(request, user_id)
 
-        if role == 'police' and office_uuid and not PoliceOffice.objects.filter(office_id=office_uuid).exists():
+        # Get all police office locations (small table, and we need every row anyway).
+        # Fetch it up front so the "does my office still exist?" check below
+        # reuses these rows instead of running a separate .exists() query.
+        all_offices = list(PoliceOfficeLoginSerializer.setup_eager_loading(PoliceOffice.objects.all()))
+
+        if role == 'police' and office_uuid and not any(o.office_id == office_uuid for o in all_offices):
             return Response(
                 {"detail": "Your police office account was not found in the database. Please log out and log in again."},
                 status=status.HTTP_401_UNAUTHORIZED,
@@ -780,35 +1018,44 @@ class AdminMapAPIView(APIView):
         scope_checkpoints = request.query_params.get('scope_checkpoints', 'our_office' if role == 'police' else 'all')
         
         # Get reports, filtered by scope
-        report_qs = Report.objects.all().select_related('reporter', 'assigned_office')
+        report_qs = ReportListSerializer.setup_eager_loading(Report.objects.all())
         if scope_reports == 'our_office' and role == 'police' and office_uuid:
             # Filter to show ONLY reports assigned to this police office
             report_qs = report_qs.filter(assigned_office_id=office_uuid)
         # If scope_reports == 'all' or user is admin, show all reports (no filter)
 
+        # Optional: skip old history (e.g. ?since=2026-01-01T00:00:00+08:00)
+        since_raw = request.query_params.get('since')
+        if since_raw:
+            try:
+                since = parse_datetime(since_raw)
+            except ValueError:
+                since = None
+            if since is None:
+                return Response({"detail": "Invalid 'since' value. Use an ISO datetime."}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            report_qs = report_qs.filter(created_at__gte=since)
+
         # Frontend filters by status, so return all statuses (active + resolved + canceled)
         filtered_reports = report_qs.order_by('-created_at')
-        reports_serializer = ReportListSerializer(filtered_reports, many=True)
-
-        # Get all police office locations
-        all_offices = PoliceOffice.objects.all()
-        offices_data = PoliceOfficeLoginSerializer(all_offices, many=True).data
 
         # Get checkpoints, filtered by scope
-        all_checkpoints = Checkpoint.objects.all().select_related('office').order_by('-created_at')
+        all_checkpoints = CheckpointSerializer.setup_eager_loading(Checkpoint.objects.all()).order_by('-created_at')
         if scope_checkpoints == 'our_office' and role == 'police' and office_uuid:
             # Filter to show ONLY checkpoints from this police office
             all_checkpoints = all_checkpoints.filter(office_id=office_uuid)
         # If scope_checkpoints == 'all' or user is admin, show all checkpoints (no filter)
-        checkpoints_data = CheckpointSerializer(all_checkpoints, many=True).data
 
-        # Return all three data types in one response
-        payload = {
-            'active_reports': reports_serializer.data,
-            'police_offices': offices_data,
-            'active_checkpoints': checkpoints_data,
-        }
-        return Response(payload, status=status.HTTP_200_OK)
+        # Stream all three data types in one response.
+        # Rows are fetched/serialized in chunks so big cities don't hold every
+        # report (ORM objects + dicts) in memory at once.
+        payload = stream_json_object([
+            ('active_reports', filtered_reports, ReportListSerializer),
+            ('police_offices', all_offices, PoliceOfficeLoginSerializer),
+            ('active_checkpoints', all_checkpoints, CheckpointSerializer),
+        ])
+        return StreamingHttpResponse(payload, content_type='application/json', status=status.HTTP_200_OK)
 
 
 # ============================================================================
@@ -876,22 +1123,16 @@ class AdminManualReportCreateAPIView(APIView):
                 updated_at_value = timezone.make_aware(updated_at_value, manila_tz)
             update_fields['updated_at'] = updated_at_value.astimezone(dt_timezone.utc)
         if update_fields:
+            # update() + a PK read of just the two timestamps, instead of a full
+            # re-fetch with joins. Read back what is really stored (the tbl_reports
+            # trigger may adjust updated_at). reporter/assigned_office are already
+            # cached on the instance from serializer.save().
             Report.objects.filter(report_id=report.report_id).update(**update_fields)
-            report = Report.objects.select_related('reporter', 'assigned_office').get(report_id=report.report_id)
+            report.refresh_from_db(fields=['created_at', 'updated_at'])
 
         # If created as Resolved, bump summary analytics so it counts immediately
-        if status_value == 'Resolved' and report.location_city and report.location_barangay and report.category:
-            with transaction.atomic():
-                obj, _created = SummaryAnalytics.objects.select_for_update().get_or_create(
-                    location_city=report.location_city,
-                    location_barangay=report.location_barangay,
-                    category=report.category,
-                    defaults={'report_count': 0},
-                )
-                SummaryAnalytics.objects.filter(summary_id=obj.summary_id).update(
-                    report_count=F('report_count') + 1,
-                    last_updated=timezone.now(),
-                )
+        if status_value == 'Resolved':
+            increment_summary_analytics(report.location_city, report.location_barangay, report.category)
 
         # Return full report view payload for immediate UI display
         return Response(ReportListSerializer(report).data, status=status.HTTP_201_CREATED)
@@ -957,6 +1198,10 @@ class AdminPasswordHashAPIView(APIView):
             return error_response
         if role != 'admin':
             return Response({"detail": "Admin access required."}, status=status.HTTP_403_FORBIDDEN)
+        if rate_limited('password_hash', user_id, PASSWORD_HASH_RATE_LIMIT):
+            return Response({
+                "detail": "Too many password hash requests. Please wait a minute and try again."
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
         
         password = request.data.get('password')
         if not password:
@@ -966,7 +1211,6 @@ class AdminPasswordHashAPIView(APIView):
             )
         
         # Hash the password using Django's make_password (same as used in serializers)
-        from django.contrib.auth.hashers import make_password
         hashed_password = make_password(password)
         
         return Response({
@@ -994,15 +1238,14 @@ class AdminProfileAPIView(APIView):
         if role != 'admin':
             return Response({"detail": "Admin access required."}, status=status.HTTP_403_FORBIDDEN)
         
-        try:
-            admin = Admin.objects.get(admin_id=user_id)
-            serializer = AdminSerializer(admin)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except Admin.DoesNotExist:
+        admin = get_request_admin(request, user_id)
+        if admin is None:
             return Response(
                 {"detail": "Admin account not found."},
                 status=status.HTTP_404_NOT_FOUND
             )
+        serializer = AdminSerializer(admin)
+        return Response(serializer.data, status=status.HTTP_200_OK)
     
     def patch(self, request):
         """Update current admin's profile (username, email, contact_no)"""
@@ -1012,9 +1255,8 @@ class AdminProfileAPIView(APIView):
         if role != 'admin':
             return Response({"detail": "Admin access required."}, status=status.HTTP_403_FORBIDDEN)
         
-        try:
-            admin = Admin.objects.get(admin_id=user_id)
-        except Admin.DoesNotExist:
+        admin = get_request_admin(request, user_id)
+        if admin is None:
             return Response(
                 {"detail": "Admin account not found."},
                 status=status.HTTP_404_NOT_FOUND
@@ -1033,7 +1275,15 @@ class AdminProfileAPIView(APIView):
         )
         
         if serializer.is_valid():
-            serializer.save()
+            try:
+                serializer.save()
+            except IntegrityError:
+                # The DB unique constraints are the final authority
+                # (another admin took the same email/username just now)
+                return Response(
+                    {"detail": "An admin with this email or username already exists."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
             # Return updated admin data
             updated_serializer = AdminSerializer(admin)
             return Response(updated_serializer.data, status=status.HTTP_200_OK)
@@ -1055,10 +1305,13 @@ class AdminPasswordChangeAPIView(APIView):
             return error_response
         if role != 'admin':
             return Response({"detail": "Admin access required."}, status=status.HTTP_403_FORBIDDEN)
+        if rate_limited('password_hash', user_id, PASSWORD_HASH_RATE_LIMIT):
+            return Response({
+                "detail": "Too many password change requests. Please wait a minute and try again."
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
         
-        try:
-            admin = Admin.objects.get(admin_id=user_id)
-        except Admin.DoesNotExist:
+        admin = get_request_admin(request, user_id)
+        if admin is None:
             return Response(
                 {"detail": "Admin account not found."},
                 status=status.HTTP_404_NOT_FOUND
@@ -1068,7 +1321,6 @@ class AdminPasswordChangeAPIView(APIView):
         if serializer.is_valid():
             new_password = serializer.validated_data['new_password']
             # Hash the new password using Django's make_password
-            from django.contrib.auth.hashers import make_password
             admin.password = make_password(new_password)
             admin.save()
             
@@ -1121,13 +1373,14 @@ class ReverseGeocodeAPIView(APIView):
             )
         
         # Build full address string (as detailed as possible)
-        parts = []
-        if address_line:
-            parts.append(address_line)
-        if barangay and barangay not in (address_line or ''):
-            parts.append(barangay)
-        if city and city not in (address_line or ''):
-            parts.append(city)
+        # One pass: skip barangay/city if already mentioned (any case) in what
+        # we have so far, e.g. address_line often already contains the barangay.
+        parts = [address_line] if address_line else []
+        seen_text = (address_line or '').lower()
+        for part in (barangay, city):
+            if part and part.lower() not in seen_text:
+                parts.append(part)
+                seen_text += '|' + part.lower()
         
         full_address = ', '.join(parts) if parts else None
         
@@ -1143,12 +1396,18 @@ class ReverseGeocodeAPIView(APIView):
 # ANALYTICS UPDATE VIEW (Cache Manager)
 # ============================================================================
 
+# Fixed key for pg_try_advisory_xact_lock (any constant bigint works, it just
+# has to be the same in every process - Python's hash() is not)
+ANALYTICS_UPDATE_LOCK_ID = 734100001
+
+
 class AnalyticsUpdateAPIView(APIView):
     # ENDPOINT: POST /analytics/update/
     # Used when: Admin wants to refresh the analytics cache (or called periodically)
     # Process: Re-calculates statistics for ALL location/category combinations
+    #          and upserts them (only changed counts are rewritten, stale rows removed)
     # Purpose: Pre-calculates data so analytics page loads instantly (no heavy queries)
-    # Safety: Uses a "lock" to prevent multiple updates running at the same time
+    # Safety: Uses a database (advisory) lock to prevent multiple updates running at the same time
 
     def post(self, request):
         # Require JWT: only authenticated police/admin can rebuild analytics cache
@@ -1159,46 +1418,20 @@ class AnalyticsUpdateAPIView(APIView):
             return Response({"detail": "You do not have permission to perform this action."}, status=status.HTTP_403_FORBIDDEN)
 
         # Prevent two updates from running simultaneously (causes database issues)
-        # cache.add() returns False if key already exists
-        lock_key = 'analytics_update_lock'
-        lock_acquired = cache.add(lock_key, 'locked', timeout=60)  # Lock expires after 60 seconds
-        if not lock_acquired:
-            # Another update is already in progress
-            return Response({"detail": "Analytics update already in progress. Please wait and try again."}, status=status.HTTP_409_CONFLICT)
-
-        try:
-            # True "rebuild": clear stale cache rows first (prevents old cities lingering)
-            SummaryAnalytics.objects.all().delete()
-
-            # Group all resolved reports by location and category, count each group
-            aggregated_data = (
-                Report.objects.filter(status__iexact='Resolved')
-                .annotate(
-                    _city=Coalesce('location_city', Value('')),
-                    _barangay=Coalesce('location_barangay', Value('Unknown')),
-                )
-                .values('_city', '_barangay', 'category')
-                .annotate(report_count=Count('report_id'))
-            )
-
-            # For each location/category combination, update or create SummaryAnalytics record
-            for item in aggregated_data:
-                # Skip if location wasn't geocoded yet
-                if not item['_city']:
-                    continue
-                # Update existing record or create new one if it doesn't exist
-                SummaryAnalytics.objects.update_or_create(
-                    location_city=item['_city'],
-                    location_barangay=item['_barangay'],
-                    category=item['category'],
-                    defaults={  # These fields get updated/set
-                        'report_count': item['report_count'],
-                        'last_updated': timezone.now(),
-                    },
-                )
-
-            return Response({"detail": "Analytics summary table updated successfully."}, status=status.HTTP_200_OK)
-        finally:
-            # Always remove the lock, even if there's an error
-            # This prevents the system from getting stuck
-            cache.delete(lock_key)
+        # Uses a PostgreSQL advisory lock so it works across ALL server processes
+        # (the in-memory cache is per-process, so a cache lock can't do this).
+        # The lock is tied to the transaction: it is released automatically on
+        # commit/rollback, so an error can never leave it stuck.
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_xact_lock(%s)', [ANALYTICS_UPDATE_LOCK_ID])
+                lock_acquired = cursor.fetchone()[0]
+            if not lock_acquired:
+                # Another update is already in progress
+                return Response({"detail": "Analytics update already in progress. Please wait and try again."}, status=status.HTTP_409_CONFLICT)
+
+            # Count resolved reports per location + category and upsert them,
+            # all inside PostgreSQL (one INSERT ... SELECT ... GROUP BY)
+            rebuild_summary_analytics()
+
+        return Response({"detail": "Analytics summary table updated successfully."}, status=status.HTTP_200_OK)
@@ -4,35 +4,35 @@
 # Each view calculates different aspects of crime data (overview, hotspots, etc.)
 # ============================================================================
 
-import uuid as uuid_module
-
+from django.core.cache import cache
 from django.http import HttpResponse
 from django.utils import timezone
-from django.db.models import F, DurationField, ExpressionWrapper, Avg
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
+from django.db.models import F, Q, Count, DurationField, ExpressionWrapper, Avg
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from ..models import Report, PoliceOffice
+from ..models import Report
 from ..services import (
     parse_filters,
+    build_scoped_report_qs,
     apply_common_filters,
     build_top_locations,
     build_category_concentration,
     compute_avg_resolution,
+    format_duration,
+    get_office_footer,
     render_pdf,
     build_analytics_filename,
 )
 from ..views import validate_jwt_token
 
 
-def convert_user_id_to_uuid(user_id):
-    """Convert user_id string from JWT to UUID for database filtering."""
-    if not user_id:
-        return None
-    try:
-        return uuid_module.UUID(user_id)
-    except (ValueError, TypeError):
-        return None
+# The export only uses the global report count for a "% of all reports" line,
+# so a minute-old number is fine and saves a full-table count per PDF.
+REPORTS_TOTAL_CACHE_KEY = 'reports_total_count'
+REPORTS_TOTAL_CACHE_TTL = 60
 
 
 # ============================================================================
@@ -52,9 +52,6 @@ class AnalyticsOverviewSummaryAPIView(APIView):
         if not is_valid:
             return error_response
         
-        # Convert user_id string to UUID for database filtering
-        office_uuid = convert_user_id_to_uuid(user_id)
-        
         # Parse all filter parameters from the request
         # Returns dict with: days, scope, office_id, city, barangay, category
         f = parse_filters(request)
@@ -62,48 +59,32 @@ class AnalyticsOverviewSummaryAPIView(APIView):
         # Start with all reports
         base_qs = Report.objects.all()
         
-        # Role scoping
-        # - police: may choose 'our_office' or 'all' via UI
-        # - admin: may choose 'our_office' + office_id, or 'all'
-        if role == 'police':
-            if f['scope'] == 'our_office':
-                if office_uuid:
-                    base_qs = base_qs.filter(assigned_office_id=office_uuid)
-                f['scope'] = 'our_office'
-                f['office_id'] = str(user_id)
-            else:
-                # Scope = all (ignore office_id for police in this mode)
-                f['scope'] = 'all'
-                f['office_id'] = None
-        elif role == 'admin' and f['scope'] == 'our_office' and f['office_id']:
-            # Admin explicitly selected a specific office
-            admin_office_uuid = convert_user_id_to_uuid(f['office_id'])
-            if admin_office_uuid:
-                base_qs = base_qs.filter(assigned_office_id=admin_office_uuid)
+        # Role scoping (see build_scoped_report_qs for rules)
+        base_qs = build_scoped_report_qs(base_qs, user_id, role, f)
         
         # Apply remaining filters (date, city, barangay, category) to the report queryset
         # Returns filtered reports based on date range, location, etc.
         base = apply_common_filters(base_qs, f)
 
-        # Count how many reports match the filters
-        total_assigned = base.count()
-        
-        # Resolved reports should still appear even if updated_at is missing.
-        # But resolution time calculation REQUIRES updated_at.
-        resolved_all = base.filter(status__iexact='Resolved')
-        resolved_with_updated = resolved_all.filter(updated_at__isnull=False)
-        resolved_missing_updated = resolved_all.filter(updated_at__isnull=True)
-        
-        # Calculate average time from report submission to resolution (only those with updated_at)
-        avg_res_str = compute_avg_resolution(resolved_with_updated)
+        # Count everything the card needs in ONE aggregate query (one scan of the filtered rows).
+        # Resolved reports should still be counted even if updated_at is missing,
+        # but resolution time calculation REQUIRES updated_at.
+        resolved = Q(status='Resolved')
+        resolution_delta = ExpressionWrapper(F('updated_at') - F('created_at'), output_field=DurationField())
+        agg = base.aggregate(
+            total_assigned=Count('report_id'),
+            total_resolved=Count('report_id', filter=resolved),
+            resolved_missing_updated=Count('report_id', filter=resolved & Q(updated_at__isnull=True)),
+            avg_res=Avg(resolution_delta, filter=resolved & Q(updated_at__isnull=False)),
+        )
 
         # Return the summary as JSON
         payload = {
             "filters": {k: (str(v) if v is not None else None) for k, v in f.items()},
-            "total_assigned": total_assigned,
-            "total_resolved": resolved_all.count(),
-            "resolved_missing_updated_at": resolved_missing_updated.count(),
-            "average_resolution_time": avg_res_str,
+            "total_assigned": agg['total_assigned'],
+            "total_resolved": agg['total_resolved'],
+            "resolved_missing_updated_at": agg['resolved_missing_updated'],
+            "average_resolution_time": format_duration(agg['avg_res']),
         }
         return Response(payload, status=200)
 
@@ -112,6 +93,8 @@ class AnalyticsOverviewSummaryAPIView(APIView):
 # LOCATION HOTSPOTS VIEW (Top Crime Locations)
 # ============================================================================
 
+# gzip the JSON when the browser sends Accept-Encoding: gzip
+@method_decorator(gzip_page, name='dispatch')
 class LocationHotspotsAPIView(APIView):
     # ENDPOINT: GET /analytics/hotspots/locations/
     # Used when: Analytics dashboard shows "Where do crimes happen most?"
@@ -125,30 +108,14 @@ class LocationHotspotsAPIView(APIView):
         if not is_valid:
             return error_response
         
-        # Convert user_id string to UUID for database filtering
-        office_uuid = convert_user_id_to_uuid(user_id)
-        
         # Parse all filter parameters from the request
         f = parse_filters(request)
         
         # Start with all reports
         base_qs = Report.objects.all()
         
-        # Role scoping (see AnalyticsOverviewSummaryAPIView for rules)
-        if role == 'police':
-            if f['scope'] == 'our_office':
-                if office_uuid:
-                    base_qs = base_qs.filter(assigned_office_id=office_uuid)
-                f['scope'] = 'our_office'
-                f['office_id'] = str(user_id)
-            else:
-                f['scope'] = 'all'
-                f['office_id'] = None
-        elif role == 'admin' and f['scope'] == 'our_office' and f['office_id']:
-            # Admin explicitly selected a specific office
-            admin_office_uuid = convert_user_id_to_uuid(f['office_id'])
-            if admin_office_uuid:
-                base_qs = base_qs.filter(assigned_office_id=admin_office_uuid)
+        # Role scoping (see build_scoped_report_qs for rules)
+        base_qs = build_scoped_report_qs(base_qs, user_id, role, f)
         
         # Build location hotspots data (top locations, report counts, percentages)
         # Returns dict with: {results: [...top 3 locations...], total_resolved: count}
@@ -162,6 +129,8 @@ class LocationHotspotsAPIView(APIView):
 # CATEGORY CONCENTRATION VIEW (Crime Types)
 # ============================================================================
 
+# gzip the JSON when the browser sends Accept-Encoding: gzip
+@method_decorator(gzip_page, name='dispatch')
 class CategoryConcentrationAPIView(APIView):
     # ENDPOINT: GET /analytics/hotspots/categories/
     # Used when: Analytics dashboard shows "Which crimes are most common?"
@@ -175,30 +144,14 @@ class CategoryConcentrationAPIView(APIView):
         if not is_valid:
             return error_response
         
-        # Convert user_id string to UUID for database filtering
-        office_uuid = convert_user_id_to_uuid(user_id)
-        
         # Parse all filter parameters from the request
         f = parse_filters(request)
         
         # Start with all reports
         base_qs = Report.objects.all()
         
-        # Role scoping (see AnalyticsOverviewSummaryAPIView for rules)
-        if role == 'police':
-            if f['scope'] == 'our_office':
-                if office_uuid:
-                    base_qs = base_qs.filter(assigned_office_id=office_uuid)
-                f['scope'] = 'our_office'
-                f['office_id'] = str(user_id)
-            else:
-                f['scope'] = 'all'
-                f['office_id'] = None
-        elif role == 'admin' and f['scope'] == 'our_office' and f['office_id']:
-            # Admin explicitly selected a specific office
-            admin_office_uuid = convert_user_id_to_uuid(f['office_id'])
-            if admin_office_uuid:
-                base_qs = base_qs.filter(assigned_office_id=admin_office_uuid)
+        # Role scoping (see build_scoped_report_qs for rules)
+        base_qs = build_scoped_report_qs(base_qs, user_id, role, f)
         
         # Build crime category concentration data (top categories, counts, percentages)
         # Returns dict with: {results: [...top 2 categories...], total_resolved: count}
@@ -225,30 +178,14 @@ class AnalyticsExportAPIView(APIView):
         if not is_valid:
             return error_response
         
-        # Convert user_id string to UUID for database filtering
-        office_uuid = convert_user_id_to_uuid(user_id)
-        
         # Parse all filter parameters from the request
         f = parse_filters(request)
         
         # Start with all reports
         base_qs = Report.objects.all()
         
-        # Role scoping (see AnalyticsOverviewSummaryAPIView for rules)
-        if role == 'police':
-            if f['scope'] == 'our_office':
-                if office_uuid:
-                    base_qs = base_qs.filter(assigned_office_id=office_uuid)
-                f['scope'] = 'our_office'
-                f['office_id'] = str(user_id)
-            else:
-                f['scope'] = 'all'
-                f['office_id'] = None
-        elif role == 'admin' and f['scope'] == 'our_office' and f['office_id']:
-            # Admin explicitly selected a specific office
-            admin_office_uuid = convert_user_id_to_uuid(f['office_id'])
-            if admin_office_uuid:
-                base_qs = base_qs.filter(assigned_office_id=admin_office_uuid)
+        # Role scoping (see build_scoped_report_qs for rules)
+        base_qs = build_scoped_report_qs(base_qs, user_id, role, f)
         
         # Apply filters to get matching reports
         base = apply_common_filters(base_qs, f)
@@ -257,37 +194,37 @@ class AnalyticsExportAPIView(APIView):
         total_assigned = base.count()
         
         # Get resolved ones and calculate average resolution time
-        resolved = base.filter(status__iexact='Resolved', updated_at__isnull=False)
+        resolved = base.filter(status='Resolved', updated_at__isnull=False)
         avg_res_str = compute_avg_resolution(resolved)
 
         # Get location and category data for the PDF
+        # Pass the scoped (not yet filtered) queryset: both builders apply
+        # apply_common_filters themselves and need the unfiltered-by-city rows
+        # for their dropdown options.
         loc_ctx = build_top_locations(base_qs, f)
         cat_ctx = build_category_concentration(base_qs, f)
 
         # Calculate what percentage of ALL reports the filtered reports represent
         # Example: "60 reports out of 300 total = 20%"
-        all_reports_total = Report.objects.count()
+        all_reports_total = cache.get(REPORTS_TOTAL_CACHE_KEY)
+        if all_reports_total is None:
+            all_reports_total = Report.objects.count()
+            cache.set(REPORTS_TOTAL_CACHE_KEY, all_reports_total, REPORTS_TOTAL_CACHE_TTL)
         total_reports_percent = (total_assigned / all_reports_total * 100.0) if all_reports_total else 0.0
 
         # Get office information for PDF footer (who authored/printed the report)
         # Requirement: For police users, always show THEIR office head officer even when scope=all.
         office_name = 'All Offices'
         head_officer_name = 'N/A'
-        if role == 'police' and office_uuid:
-            try:
-                requester_office = PoliceOffice.objects.get(office_id=office_uuid)
-                office_name = requester_office.office_name
-                head_officer_name = requester_office.head_officer or 'N/A'
-            except PoliceOffice.DoesNotExist:
-                pass
+        footer = None
+        if role == 'police' and user_id:
+            # get_office_footer() parses the id itself (memoized), only when it's needed
+            footer = get_office_footer(user_id)
         elif f['office_id']:
             # Admin: if an office is explicitly selected, show it
-            try:
-                office = PoliceOffice.objects.get(office_id=f['office_id'])
-                office_name = office.office_name
-                head_officer_name = office.head_officer or 'N/A'
-            except PoliceOffice.DoesNotExist:
-                pass
+            footer = get_office_footer(f['office_id'])
+        if footer:
+            office_name, head_officer_name = footer
 
         # Build the context (data) to pass to the PDF template
         # This dict contains all the data the template needs to render
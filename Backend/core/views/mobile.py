@@ -9,6 +9,7 @@
 
 import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -16,11 +17,16 @@ from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.exceptions import ValidationError
 
-from ..models import Report, Media, PoliceOffice, User
-from ..services import reverse_geocode, find_nearest_office, get_media_limits
+from ..models import Report, Media, User
+from ..services import reverse_geocode, find_nearest_office, get_default_office_id, get_media_limits
 from ..serializers import get_supabase_client
 
 
+# Each Supabase upload is a blocking HTTPS round-trip, so a report's files are
+# uploaded in parallel (threads just wait on the network here).
+MEDIA_UPLOAD_WORKERS = 8
+
+
 class MobileCreateReportWithMediaAPIView(APIView):
     """
     ENDPOINT: POST /mobile/reports/
@@ -66,12 +72,8 @@ class MobileCreateReportWithMediaAPIView(APIView):
         if not User.objects.filter(user_id=reporter_uuid).exists():
             return Response({"detail": "Reporter not found in tbl_users"}, status=status.HTTP_404_NOT_FOUND)
 
-        uploaded = []
-        files = []
-        if 'uploaded_files' in request.FILES:
-            files = request.FILES.getlist('uploaded_files')
-        elif 'uploaded_file' in request.FILES:
-            files = [request.FILES['uploaded_file']]
+        uploads = request.FILES
+        files = uploads.getlist('uploaded_files') or uploads.getlist('uploaded_file')[:1]
 
         bucket = os.getenv('SUPABASE_MEDIA_BUCKET', 'crash-media')
         limits = get_media_limits()
@@ -105,21 +107,32 @@ class MobileCreateReportWithMediaAPIView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+            # Stop at the first file over the limit (no need to look at the rest)
+            if images_count > max_images or videos_count > max_videos:
+                return Response(
+                    {"detail": f"Too many media files. Max is {max_images} images and {max_videos} videos per report."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
             normalized.append({"file": f, "file_type": file_type, "content_type": content_type})
 
-        if images_count > max_images or videos_count > max_videos:
-            return Response(
-                {"detail": f"Too many media files. Max is {max_images} images and {max_videos} videos per report."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        # Resolve the storage bucket once (shared by every upload below).
+        # Done before the report is created so a misconfigured Supabase doesn't leave one behind.
+        storage = None
+        if normalized:
+            try:
+                storage = get_supabase_client().storage.from_(bucket)
+            except Exception as e:
+                raise ValidationError({"uploaded_file": f"Upload failed: {e}"})
 
         # Geocode + assign nearest office (same idea as ReportViewSet.perform_create)
         location_city, location_barangay = reverse_geocode(latitude, longitude)
-        assigned_office = find_nearest_office(latitude, longitude) or PoliceOffice.objects.all().first()
+        assigned_office = find_nearest_office(latitude, longitude)
+        assigned_office_id = assigned_office.office_id if assigned_office else get_default_office_id()
 
         report = Report.objects.create(
             reporter_id=reporter_uuid,
-            assigned_office=assigned_office,
+            assigned_office_id=assigned_office_id,
             category=category,
             description=description,
             latitude=latitude,
@@ -128,7 +141,7 @@ class MobileCreateReportWithMediaAPIView(APIView):
             location_barangay=location_barangay,
         )
 
-        for item in normalized:
+        def _upload(item):
             f = item["file"]
             file_type = item["file_type"]
             content_type = item["content_type"]
@@ -143,48 +156,70 @@ class MobileCreateReportWithMediaAPIView(APIView):
             storage_path = f"reports/{report.report_id}/{file_type}/{file_name}"
 
             # Upload bytes
-            try:
-                supabase = get_supabase_client()
-                res = supabase.storage.from_(bucket).upload(
-                    storage_path,
-                    f.read(),
-                    file_options={
-                        "content-type": content_type or "application/octet-stream",
-                        "upsert": False,
-                    },
-                )
-                if isinstance(res, dict) and res.get('error'):
-                    raise Exception(res.get('error'))
-            except Exception as e:
-                msg = str(e)
-                if 'Bucket not found' in msg:
-                    return Response(
-                        {"detail": f"Supabase bucket '{bucket}' not found. Create it in Supabase Storage (and make it public), then try again."},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-                raise ValidationError({"uploaded_file": f"Upload failed: {e}"})
+            # Big files (over FILE_UPLOAD_MAX_MEMORY_SIZE) are already spooled to a temp file by
+            # Django, so hand the SDK an open file and let it stream instead of reading it all into RAM.
+            # Small in-memory uploads are passed as bytes like before.
+            file_options = {
+                "content-type": content_type or "application/octet-stream",
+                "upsert": False,
+            }
+            if hasattr(f, 'temporary_file_path'):
+                with open(f.temporary_file_path(), 'rb') as fh:
+                    res = storage.upload(storage_path, fh, file_options=file_options)
+            else:
+                res = storage.upload(storage_path, f.read(), file_options=file_options)
+            if isinstance(res, dict) and res.get('error'):
+                raise Exception(res.get('error'))
 
             # URL
-            supabase = get_supabase_client()
-            public_url = supabase.storage.from_(bucket).get_public_url(storage_path)
+            public_url = storage.get_public_url(storage_path)
             if isinstance(public_url, dict):
                 public_url = public_url.get('publicUrl') or public_url.get('public_url')
 
-            media_row = Media.objects.create(
-                media_id=media_id,
+            return {"media_id": media_id, "file_url": public_url, "file_type": file_type}
+
+        # Upload all files at once; results keep the same order as the request
+        results = []
+        errors = []
+        if normalized:
+            with ThreadPoolExecutor(max_workers=min(MEDIA_UPLOAD_WORKERS, len(normalized))) as ex:
+                futures = [ex.submit(_upload, item) for item in normalized]
+            for fut in futures:
+                try:
+                    results.append(fut.result())
+                except Exception as e:
+                    errors.append(e)
+
+        if errors:
+            # Don't leave a half-created report behind (no media rows were saved yet)
+            report.delete()
+            msg = str(errors[0])
+            if 'Bucket not found' in msg:
+                return Response(
+                    {"detail": f"Supabase bucket '{bucket}' not found. Create it in Supabase Storage (and make it public), then try again."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            raise ValidationError({"uploaded_file": f"Upload failed: {msg}"})
+
+        # Save all media rows in one INSERT
+        Media.objects.bulk_create([
+            Media(
+                media_id=r["media_id"],
                 report=report,
-                file_url=public_url,
-                file_type=file_type,
+                file_url=r["file_url"],
+                file_type=r["file_type"],
                 sender_id=reporter_uuid,
             )
-
-            uploaded.append(
-                {
-                    "media_id": str(media_row.media_id),
-                    "file_url": media_row.file_url,
-                    "file_type": media_row.file_type,
-                }
-            )
+            for r in results
+        ])
+        uploaded = [
+            {
+                "media_id": str(r["media_id"]),
+                "file_url": r["file_url"],
+                "file_type": r["file_type"],
+            }
+            for r in results
+        ]
 
         return Response(
             {
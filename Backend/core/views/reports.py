@@ -4,20 +4,27 @@
 # Each view handles data for "Resolved Cases" page (different from analytics)
 # ============================================================================
 
-import uuid as uuid_module
+import hashlib
 
+from django.core.cache import cache
 from django.http import HttpResponse
 from django.utils import timezone
-from django.db.models import DurationField, ExpressionWrapper, F
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
+from django.db.models import CharField, Count, DurationField, ExpressionWrapper, F, Max, Value
+from django.db.models.functions import Cast, Concat, Left, Right
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from ..models import Report, PoliceOffice, Media
+from ..models import Report, Media
+from ..pagination import OptionalPageNumberPagination
 from ..services import (
     parse_filters,
+    build_scoped_report_qs,
     apply_common_filters,
     apply_resolved_date_filter,
     format_duration,
+    get_office_footer,
     render_pdf,
     build_resolved_filename,
     short_uuid,
@@ -26,20 +33,31 @@ from ..services import (
 from ..views import validate_jwt_token
 
 
-def convert_user_id_to_uuid(user_id):
-    """Convert user_id string from JWT to UUID for database filtering."""
-    if not user_id:
-        return None
-    try:
-        return uuid_module.UUID(user_id)
-    except (ValueError, TypeError):
-        return None
+# Rendered resolved-cases PDFs are kept for a few minutes (keyed by requester,
+# filters and the matching rows' latest updated_at). The printed "generated on"
+# time is the time of the first render.
+RESOLVED_PDF_CACHE_TTL = 300  # 5 minutes
+# Big exports (hundreds of rows) are rendered every time instead of cached,
+# so a few of them can't fill a worker's memory.
+RESOLVED_PDF_CACHE_MAX_BYTES = 2 * 1024 * 1024  # 2 MB
+
+# Columns used by report_resolved_cases_audit.html (single case file PDF)
+CASE_FILE_FIELDS = (
+    'report_id', 'status', 'category', 'description', 'remarks',
+    'latitude', 'longitude', 'location_city', 'location_barangay',
+    'created_at', 'updated_at',
+    'reporter', 'reporter__first_name', 'reporter__last_name', 'reporter__email', 'reporter__phone',
+    'reporter__emergency_contact_name', 'reporter__emergency_contact_number',
+    'assigned_office', 'assigned_office__office_name', 'assigned_office__head_officer',
+)
 
 
 # ============================================================================
 # RESOLVED CASES LIST VIEW (JSON)
 # ============================================================================
 
+# gzip the JSON table when the browser sends Accept-Encoding: gzip
+@method_decorator(gzip_page, name='dispatch')
 class ResolvedCasesAPIView(APIView):
     # ENDPOINT: GET /reports/resolved/
     # Used when: Frontend loads the Resolved Cases page (list view)
@@ -53,34 +71,15 @@ class ResolvedCasesAPIView(APIView):
         if not is_valid:
             return error_response
 
-        # Convert user_id string to UUID for database filtering
-        office_uuid = convert_user_id_to_uuid(user_id)
-
         # Parse all filter parameters from the request
         f = parse_filters(request)
         
         # Start with resolved reports (do NOT require updated_at, otherwise older resolved rows disappear)
-        # Use case-insensitive match to tolerate manual DB edits.
-        base_qs = Report.objects.filter(status__iexact='Resolved')
-        base_qs = base_qs.select_related('reporter', 'assigned_office')
-
-        # Role scoping
-        # - police: may choose 'our_office' or 'all' via UI
-        # - admin: may choose 'our_office' + office_id, or 'all'
-        if role == 'police':
-            if f['scope'] == 'our_office':
-                if office_uuid:
-                    base_qs = base_qs.filter(assigned_office_id=office_uuid)
-                f['scope'] = 'our_office'
-                f['office_id'] = str(user_id)
-            else:
-                f['scope'] = 'all'
-                f['office_id'] = None
-        elif role == 'admin' and f['scope'] == 'our_office' and f['office_id']:
-            # Admin explicitly selected a specific office
-            admin_office_uuid = convert_user_id_to_uuid(f['office_id'])
-            if admin_office_uuid:
-                base_qs = base_qs.filter(assigned_office_id=admin_office_uuid)
+        # Exact match: status is a Postgres enum, so it can't hold other casings (and this uses the status indexes).
+        base_qs = Report.objects.filter(status='Resolved')
+
+        # Role scoping (see build_scoped_report_qs for rules)
+        base_qs = build_scoped_report_qs(base_qs, user_id, role, f)
 
         # Apply remaining filters (city/barangay, category, created-date range)
         base = apply_common_filters(base_qs, f)
@@ -91,37 +90,47 @@ class ResolvedCasesAPIView(APIView):
         # Calculate resolution time for each report (updated_at - created_at)
         # This is a database calculation, not Python
         res_delta = ExpressionWrapper(F('updated_at') - F('created_at'), output_field=DurationField())
-        qs = base.annotate(resolution_time=res_delta)
-        
+
+        # Pull only the columns this page shows, with reporter/office names joined in
+        # the same query (no Report instances are built for each row)
+        qs = base.annotate(
+            resolution_time=res_delta,
+            reporter_first=F('reporter__first_name'),
+            reporter_last=F('reporter__last_name'),
+            assigned_office_name=F('assigned_office__office_name'),
+        ).values(
+            'report_id', 'category', 'created_at', 'updated_at',
+            'location_city', 'location_barangay', 'remarks', 'resolution_time',
+            'reporter_first', 'reporter_last', 'assigned_office_name',
+            'description', 'latitude', 'longitude',
+        )
+
+        # Optional pagination: ?page=N returns one page (50 rows by default, ?page_size= up to 200).
+        # Without ?page the full list is returned like before.
+        paginator = OptionalPageNumberPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        rows = qs if page is None else page
+
         # Convert to JSON-ready format with reporter and office info
         data = []
-        for report in qs:
+        for r in rows:
             # Build reporter full name from first_name + last_name
-            reporter_name = None
-            if report.reporter:
-                first = report.reporter.first_name or ''
-                last = report.reporter.last_name or ''
-                reporter_name = f"{first} {last}".strip() or None
-            
-            # Get assigned office name
-            assigned_office_name = None
-            if report.assigned_office:
-                assigned_office_name = report.assigned_office.office_name
-            
+            reporter_name = f"{r['reporter_first'] or ''} {r['reporter_last'] or ''}".strip() or None
+
             data.append({
-                'report_id': report.report_id,
-                'category': report.category,
-                'created_at': report.created_at,
-                'updated_at': report.updated_at,
-                'location_city': report.location_city,
-                'location_barangay': report.location_barangay,
-                'remarks': report.remarks,
-                'resolution_time_str': format_duration(report.resolution_time),
+                'report_id': r['report_id'],
+                'category': r['category'],
+                'created_at': r['created_at'],
+                'updated_at': r['updated_at'],
+                'location_city': r['location_city'],
+                'location_barangay': r['location_barangay'],
+                'remarks': r['remarks'],
+                'resolution_time_str': format_duration(r['resolution_time']),
                 'reporter_full_name': reporter_name,
-                'assigned_office_name': assigned_office_name,
-                'description': report.description,
-                'latitude': str(report.latitude) if report.latitude else None,
-                'longitude': str(report.longitude) if report.longitude else None,
+                'assigned_office_name': r['assigned_office_name'],
+                'description': r['description'],
+                'latitude': str(r['latitude']) if r['latitude'] else None,
+                'longitude': str(r['longitude']) if r['longitude'] else None,
             })
 
         # Return the data as JSON with metadata
@@ -130,6 +139,11 @@ class ResolvedCasesAPIView(APIView):
             "count": len(data),
             "results": data,
         }
+        if page is not None:
+            # count = total matching rows (not just this page), plus links to neighbour pages
+            payload["count"] = paginator.page.paginator.count
+            payload["next"] = paginator.get_next_link()
+            payload["previous"] = paginator.get_previous_link()
         return Response(payload, status=200)
 
 
@@ -138,6 +152,13 @@ class ResolvedCasesAPIView(APIView):
 # ============================================================================
 
 class ResolvedCasesExportAPIView(APIView):
+    """
+    Rendered PDFs are cached for RESOLVED_PDF_CACHE_TTL, up to RESOLVED_PDF_CACHE_MAX_BYTES each.
+
+    The default cache is per process (LocMemCache), so a repeat export only
+    skips WeasyPrint when it lands on the same worker; every request still
+    runs the small Max/Count probe query that builds the cache key.
+    """
     # ENDPOINT: GET /reports/resolved/export/ (PDF download)
     # Used when: User exports the resolved cases list to PDF
     # Output: Table PDF containing all resolved cases matching filters
@@ -150,66 +171,79 @@ class ResolvedCasesExportAPIView(APIView):
         if not is_valid:
             return error_response
 
-        # Convert user_id string to UUID for database filtering
-        office_uuid = convert_user_id_to_uuid(user_id)
-
         # Parse all filter parameters from the request
         f = parse_filters(request)
         
         # Start with resolved reports (do NOT require updated_at, otherwise older resolved rows disappear)
-        base_qs = Report.objects.filter(status__iexact='Resolved')
+        base_qs = Report.objects.filter(status='Resolved')
         
-        # Role scoping (same rules as ResolvedCasesAPIView)
-        if role == 'police':
-            if f['scope'] == 'our_office':
-                if office_uuid:
-                    base_qs = base_qs.filter(assigned_office_id=office_uuid)
-                f['scope'] = 'our_office'
-                f['office_id'] = str(user_id)
-            else:
-                f['scope'] = 'all'
-                f['office_id'] = None
-        elif role == 'admin' and f['scope'] == 'our_office' and f['office_id']:
-            # Admin explicitly selected a specific office
-            admin_office_uuid = convert_user_id_to_uuid(f['office_id'])
-            if admin_office_uuid:
-                base_qs = base_qs.filter(assigned_office_id=admin_office_uuid)
+        # Role scoping (see build_scoped_report_qs for rules)
+        base_qs = build_scoped_report_qs(base_qs, user_id, role, f)
 
         base = apply_common_filters(base_qs, f)
         base = apply_resolved_date_filter(base, f.get('since')).order_by('-updated_at')
+
+        # Same requester + same filters + same matching rows = same PDF, so reuse it.
+        # Latest updated_at + row count change whenever a matching case is edited,
+        # resolved or removed (one small aggregate instead of a WeasyPrint render).
+        # 'since' is left out of the key because it moves with the clock; 'days' covers it.
+        probe = base.aggregate(last_updated=Max('updated_at'), total=Count('report_id'))
+        key_parts = (
+            role,
+            str(user_id),
+            sorted((k, v) for k, v in f.items() if k != 'since'),
+            probe['last_updated'],
+            probe['total'],
+        )
+        cache_key = 'resolved_pdf:' + hashlib.blake2b(repr(key_parts).encode(), digest_size=16).hexdigest()
+        pdf = cache.get(cache_key)
+        if pdf is None:
+            pdf = self._render_pdf(request, role, user_id, f, base)
+            if len(pdf) <= RESOLVED_PDF_CACHE_MAX_BYTES:
+                cache.set(cache_key, pdf, RESOLVED_PDF_CACHE_TTL)
+
+        # Generate a descriptive filename for the PDF
+        filename = build_resolved_filename(f)
         
+        # Create HTTP response with the PDF
+        response = HttpResponse(pdf, content_type='application/pdf')
+        # 'inline' = show in browser, not 'attachment' which forces download
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+        return response
+
+    def _render_pdf(self, request, role, user_id, f, base):
+        # FUNCTION: Query the rows and render the PDF bytes (only on a cache miss in get())
         # Calculate resolution time for each report
         res_delta = ExpressionWrapper(F('updated_at') - F('created_at'), output_field=DurationField())
-        qs = base.annotate(resolution_time=res_delta)
+        # Shorten UUID from full to "AAAAA...ZZZZZ" for table display (same as short_uuid(), done in SQL)
+        report_id_text = Cast('report_id', CharField())
+        report_id_short = Concat(Left(report_id_text, 5), Value('...'), Right(report_id_text, 5), output_field=CharField())
+        qs = base.annotate(resolution_time=res_delta, report_id_short=report_id_short)
 
         # Convert to PDF-friendly format
+        # iterator() streams rows from the DB in chunks and skips the queryset's own
+        # result cache, so only this one list of rows is held in memory.
+        # (The template still needs a real list: it prints rows|length.)
         rows = []
-        for r in qs.values('report_id','category','created_at','updated_at','location_city','location_barangay','remarks','resolution_time'):
-            # Convert duration to readable format "2d 3h 45m"
+        values_qs = qs.values('report_id_short','category','created_at','updated_at','location_city','location_barangay','remarks','resolution_time')
+        for r in values_qs.iterator(chunk_size=500):
+            # Convert duration to readable format "2d 03:45:30"
             r['resolution_time_str'] = format_duration(r['resolution_time'])
-            # Shorten UUID from full to "AAAAA...ZZZZZ" for table display
-            r['report_id_short'] = short_uuid(str(r['report_id']))
             rows.append(r)
 
         # Get office information for PDF footer (who authored/printed the report)
         # Requirement: For police users, always show THEIR office head officer even when scope=all.
         office_name = 'All Offices'
         head_officer_name = 'N/A'
-        if role == 'police' and office_uuid:
-            try:
-                requester_office = PoliceOffice.objects.get(office_id=office_uuid)
-                office_name = requester_office.office_name
-                head_officer_name = requester_office.head_officer or 'N/A'
-            except PoliceOffice.DoesNotExist:
-                pass
+        footer = None
+        if role == 'police' and user_id:
+            # get_office_footer() parses the id itself (memoized), only when it's needed
+            footer = get_office_footer(user_id)
         elif f['office_id']:
             # Admin: if an office is explicitly selected, show it
-            try:
-                office = PoliceOffice.objects.get(office_id=f['office_id'])
-                office_name = office.office_name
-                head_officer_name = office.head_officer or 'N/A'
-            except PoliceOffice.DoesNotExist:
-                pass
+            footer = get_office_footer(f['office_id'])
+        if footer:
+            office_name, head_officer_name = footer
 
         # Build context (data) to pass to the PDF template
         context = {
@@ -225,16 +259,7 @@ class ResolvedCasesExportAPIView(APIView):
         }
 
         # Render the HTML template with the data, convert to PDF
-        pdf = render_pdf('report_resolved_cases_list.html', context, request.build_absolute_uri('/'))
-        
-        # Generate a descriptive filename for the PDF
-        filename = build_resolved_filename(f)
-        
-        # Create HTTP response with the PDF
-        response = HttpResponse(pdf, content_type='application/pdf')
-        # 'inline' = show in browser, not 'attachment' which forces download
-        response['Content-Disposition'] = f'inline; filename="{filename}"'
-        return response
+        return render_pdf('report_resolved_cases_list.html', context, request.build_absolute_uri('/'))
 
 
 # ============================================================================
@@ -252,8 +277,13 @@ class SingleReportExportAPIView(APIView):
     def get(self, request, report_id):
         try:
             # Find the specific report in database (must be resolved status)
-            # select_related = fetch reporter and office data efficiently
-            report = Report.objects.select_related('reporter', 'assigned_office').get(report_id=report_id, status='Resolved')
+            # select_related = fetch reporter and office data efficiently (one JOIN query)
+            # only() = just the columns the case file template prints (skips password hashes etc.)
+            report = (
+                Report.objects.select_related('reporter', 'assigned_office')
+                .only(*CASE_FILE_FIELDS)
+                .get(report_id=report_id, status='Resolved')
+            )
         except Report.DoesNotExist:
             # Report not found or not resolved yet
             return HttpResponse("Report not found or not resolved.", status=404)
@@ -274,20 +304,23 @@ class SingleReportExportAPIView(APIView):
         office_id_short = short_uuid(office_id_str, start=7, end=7)
 
         # Build context (data) to pass to the PDF template
-        image_media = list(
-            Media.objects.filter(report_id=report.report_id, file_type='image')
+        # One query for all evidence (a report only has a handful of files), split by type here:
+        # first 3 images and first 2 videos, oldest first
+        media_rows = (
+            Media.objects.filter(report_id=report.report_id, file_type__in=('image', 'video'))
             .exclude(file_url__isnull=True)
             .exclude(file_url__exact='')
-            .order_by('uploaded_at')[:3]
-            .values('media_id', 'file_url', 'uploaded_at')
-        )
-        video_media_rows = list(
-            Media.objects.filter(report_id=report.report_id, file_type='video')
-            .exclude(file_url__isnull=True)
-            .exclude(file_url__exact='')
-            .order_by('uploaded_at')[:2]
-            .values('media_id', 'file_url', 'uploaded_at')
+            .order_by('uploaded_at')
+            .values('media_id', 'file_type', 'file_url', 'uploaded_at')
         )
+        image_media = []
+        video_media_rows = []
+        for row in media_rows:
+            if row['file_type'] == 'image':
+                if len(image_media) < 3:
+                    image_media.append(row)
+            elif len(video_media_rows) < 2:
+                video_media_rows.append(row)
         video_media = []
         for row in video_media_rows:
             # For printing: include QR code instead of raw link
@@ -310,7 +343,13 @@ class SingleReportExportAPIView(APIView):
         }
 
         # Render the HTML template with the data, convert to PDF
-        pdf = render_pdf('report_resolved_cases_audit.html', context, request.build_absolute_uri('/'))
+        # Evidence photos are remote (Supabase Storage): download them in parallel up front
+        pdf = render_pdf(
+            'report_resolved_cases_audit.html',
+            context,
+            request.build_absolute_uri('/'),
+            prefetch_urls=[m['file_url'] for m in image_media],
+        )
         
         # Create HTTP response with the PDF
         response = HttpResponse(pdf, content_type='application/pdf')
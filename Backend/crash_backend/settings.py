@@ -151,6 +151,12 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
+    # JSON output uses orjson (much faster than the pure-Python json module).
+    # Browsable API stays available for manual testing in the browser.
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # JWT Configuration
@@ -163,6 +169,16 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),              # Authorization: Bearer <token>
 }
 
+# Password hashing: new hashes use Argon2id (core/hashers.py).
+# The other hashers stay listed so existing pbkdf2_sha256$... hashes still verify.
+PASSWORD_HASHERS = [
+    'core.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -7,12 +7,16 @@ for direct insertion into Supabase.
 
 Usage:
     python hashing.py
+    python hashing.py --batch passwords.txt > hashes.txt
 
 The script will:
     1. Prompt for the desired password (input is hidden for security)
     2. Hash it using Django's make_password() function
     3. Output the hashed password to the terminal
 
+Batch mode (seeding many accounts): reads one password per line from the file and
+prints one hash per line, in the same order. Hashing is spread over all CPU cores.
+
 Note: This script requires Django environment setup. Run from the Backend directory
 where manage.py is located, or ensure Django settings are configured.
 """
@@ -20,6 +24,8 @@ where manage.py is located, or ensure Django settings are configured.
 import os
 import sys
 import getpass
+import argparse
+from multiprocessing import Pool, cpu_count
 
 # Add the project directory to Python path so Django can find settings
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -33,9 +39,37 @@ django.setup()
 from django.contrib.auth.hashers import make_password
 
 
+def hash_batch(path):
+    # One password per line (only the line break is stripped, spaces are kept).
+    # Blank lines are skipped.
+    with open(path, encoding='utf-8') as fh:
+        passwords = [line.rstrip('\r\n') for line in fh]
+    passwords = [p for p in passwords if p]
+    if not passwords:
+        print("Error: No passwords found in batch file.", file=sys.stderr)
+        sys.exit(1)
+
+    # Each hash is deliberately slow, so hash several at once (one per CPU core).
+    # Pool.map keeps the output in the same order as the input file.
+    with Pool(min(cpu_count(), len(passwords))) as pool:
+        hashes = pool.map(make_password, passwords, chunksize=1)
+
+    for hashed in hashes:
+        print(hashed)
+    print(f"Hashed {len(hashes)} password(s).", file=sys.stderr)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Convert plain text passwords to Django password hashes.")
+    parser.add_argument('--batch', metavar='FILE', help="hash every line of FILE (one password per line)")
+    args = parser.parse_args()
+
+    if args.batch:
+        hash_batch(args.batch)
+        return
+
     print("=" * 60)
-    print("Password Hash Converter (Django PBKDF2)")
+    print("Password Hash Converter (Django Argon2)")
     print("=" * 60)
     print()
     print("This script converts a plain text password to Django hashed password.")
@@ -55,7 +89,7 @@ def main():
     
     print()
     print("=" * 60)
-    print("HASHED PASSWORD (Django PBKDF2):")
+    print("HASHED PASSWORD (Django Argon2):")
     print("=" * 60)
     print(hashed)
     print("=" * 60)
@@ -10,7 +10,7 @@ import apiClient from '../services/apiClient'
  * The hashed password is then sent to Admin2 (senior IT) via office communication platform.
  * Admin2 uses the hashed password to insert directly into Supabase.
  * 
- * Security: Password is hashed client-side using Django's PBKDF2 algorithm (simulated via API call).
+ * Security: Password is hashed client-side using Django's Argon2 hasher (via API call).
  * The plain password never leaves the browser until hashed.
  */
 export default function PasswordHashConverter() {
@@ -69,7 +69,7 @@ export default function PasswordHashConverter() {
 
   /**
    * Format hashed password for display (show first 8 and last 8 characters)
-   * Example: "pbkdf2_sha256$600000$abc123...xyz789$hashed="
+   * Example: "argon2$argon2id$v=19$m=65536,t=2,p=4$abc123...xyz789"
    */
   function formatHashedPassword(hash) {
     if (!hash || hash.length <= 16) return hash
@@ -132,7 +132,7 @@ export default function PasswordHashConverter() {
           {hashedPassword && (
             <div className="space-y-3">
               <label className="block text-sm font-medium text-white mb-2">
-                Hashed Password (Django PBKDF2)
+                Hashed Password (Django Argon2)
               </label>
               <div className="backdrop-blur-md bg-white/5 border border-white/10 rounded-xl p-4">
                 <div className="flex items-center justify-between gap-3">